@@ -1,14 +1,29 @@
 import streamlit as st
-import requests
+import httpx
+import asyncio
 import psycopg
+from psycopg.conninfo import make_conninfo
+from psycopg_pool import ConnectionPool
 import os
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
+from decimal import Decimal
 from dotenv import load_dotenv
-from werkzeug.security import generate_password_hash, check_password_hash
+from werkzeug.security import check_password_hash
+from argon2 import PasswordHasher
+from argon2.exceptions import VerificationError, InvalidHashError
 import time
-import json
+import re
+import random
+import redis
+import orjson
+from cachetools import TTLCache
+from functools import wraps, lru_cache
+from operator import itemgetter
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 
 # Import our enhanced components
 from styles.modern_ui import (
@@ -18,9 +33,8 @@ from styles.modern_ui import (
 )
 from components.dashboard import (
     create_user_analytics_chart, create_leaderboard_chart, create_activity_timeline,
-    fetch_github_profile_data, create_user_profile_card, create_achievement_badges
+    parse_github_profile, create_user_profile_card, create_achievement_badges
 )
-from components.advanced_analytics import GitHubAnalytics
 from components.realtime_features import (
     live_activity_feed, live_stats, notification_system, simulate_live_activity
 )
@@ -40,8 +54,11 @@ if 'theme' not in st.session_state:
 # Apply theme
 apply_modern_theme(st.session_state.theme)
 
-# Initialize analytics
-analytics = GitHubAnalytics()
+@st.cache_resource
+def get_analytics():
+    """Analytics engine, imported on first use so pages without charts skip the plotly/sklearn import"""
+    from components.advanced_analytics import GitHubAnalytics
+    return GitHubAnalytics()
 
 load_dotenv()
 DB_NAME = os.getenv("DB_NAME")
@@ -52,23 +69,22 @@ DB_PORT = os.getenv("DB_PORT")
 
 # Database functions (enhanced with error handling and connection pooling)
 @st.cache_resource
-def get_db_connection():
-    """Get database connection with connection pooling"""
-    return psycopg.connect(
+def get_pool():
+    """Get the process-wide database connection pool"""
+    conninfo = make_conninfo(
         dbname=DB_NAME,
         user=DB_USER,
         password=DB_PASSWORD,
         host=DB_HOST,
         port=DB_PORT,
     )
-
-def connect_to_db():
-    """Connect to database with error handling"""
-    try:
-        return get_db_connection()
-    except Exception as e:
-        st.error(f"Database connection failed: {e}")
-        return None
+    return ConnectionPool(
+        conninfo=conninfo,
+        min_size=2,
+        max_size=20,
+        kwargs={"autocommit": False},
+        open=True
+    )
 
 def create_accounts_table_if_not_exists(conn):
     cursor = conn.cursor()
@@ -105,6 +121,20 @@ def create_scores_table_if_not_exists(conn):
     );
     """
     cursor.execute(create_table_query)
+
+    # Stored weighted total + index lets the leaderboard read top-K in index order
+    cursor.execute("""
+    ALTER TABLE scores ADD COLUMN IF NOT EXISTS total_score NUMERIC GENERATED ALWAYS AS (
+        COALESCE(pull_requests_opened, 0) +
+        COALESCE(pull_requests_merged, 0) * 2 +
+        COALESCE(issues_created, 0) +
+        COALESCE(issues_closed, 0) * 2 +
+        COALESCE(repos_contributed_to, 0) +
+        COALESCE(starred_repositories, 0) +
+        COALESCE(commit_changes, 0) * 0.1
+    ) STORED;
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS scores_total_score_idx ON scores (total_score DESC);")
     conn.commit()
 
 def create_activity_log_table(conn):
@@ -123,291 +153,721 @@ def create_activity_log_table(conn):
     cursor.execute(create_table_query)
     conn.commit()
 
-@st.cache_data(ttl=300)  # Cache for 5 minutes
-def fetch_commit_changes(username):
-    """Fetch commit changes with caching"""
+@st.cache_resource
+def _ensure_schema():
+    """Create the app tables once per process instead of on every write"""
+    with get_pool().connection() as conn:
+        create_accounts_table_if_not_exists(conn)
+        create_scores_table_if_not_exists(conn)
+        create_activity_log_table(conn)
+
+try:
+    _ensure_schema()
+except Exception as e:
+    st.error(f"Database initialization failed: {e}")
+
+@st.cache_resource
+def get_redis_client():
+    """Get a shared Redis client, or None when Redis is unavailable"""
+    try:
+        client = redis.Redis.from_url(os.getenv("REDIS_URL", "redis://localhost:6379/0"))
+        client.ping()
+        return client
+    except redis.RedisError:
+        return None
+
+def _orjson_default(value):
+    """Serialize values orjson doesn't handle natively (NUMERIC columns arrive as Decimal)"""
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError
+
+ETAG_CACHE_TTL = 24 * 3600  # Keep validators for a day; 304s don't count against the rate limit
+
+ETAG_MEMORY_MAX_ENTRIES = 4096
+
+@st.cache_resource
+def _etag_memory_store():
+    """In-process ETag store used when Redis is unavailable; bounded and expiring like the Redis keys"""
+    return TTLCache(maxsize=ETAG_MEMORY_MAX_ENTRIES, ttl=ETAG_CACHE_TTL), threading.Lock()
+
+def _load_etag_entry(url):
+    """Look up the cached ETag and payload for a GitHub URL"""
+    client = get_redis_client()
+    if client:
+        try:
+            cached = client.get(f"etag:{url}")
+            return orjson.loads(cached) if cached else None
+        except redis.RedisError:
+            pass
+    store, lock = _etag_memory_store()
+    with lock:
+        return store.get(url)
+
+def _store_etag_entry(url, entry):
+    """Remember the ETag and payload for a GitHub URL"""
+    client = get_redis_client()
+    if client:
+        try:
+            client.setex(f"etag:{url}", ETAG_CACHE_TTL, orjson.dumps(entry))
+            return
+        except redis.RedisError:
+            pass
+    store, lock = _etag_memory_store()
+    with lock:
+        store[url] = entry
+
+def _json(response):
+    """Decode a GitHub response body with orjson"""
+    return orjson.loads(response.content)
+
+async def _cond_get(client, url, **kwargs):
+    """GET with If-None-Match, replaying the cached payload when GitHub answers 304"""
+    entry = _load_etag_entry(url)
+    headers = {"If-None-Match": entry["etag"]} if entry else None
+    response = await client.get(url, headers=headers, **kwargs)
+
+    if response.status_code == 304 and entry:
+        replay_headers = {"ETag": entry["etag"]}
+        if entry.get("link"):
+            replay_headers["Link"] = entry["link"]
+        return httpx.Response(
+            200,
+            headers=replay_headers,
+            content=entry["body"].encode(),
+            request=response.request
+        )
+
+    etag = response.headers.get("ETag")
+    if response.status_code == 200 and etag:
+        _store_etag_entry(url, {
+            "etag": etag,
+            "link": response.headers.get("Link"),
+            "body": response.text
+        })
+    return response
+
+_LAST_PAGE_RE = re.compile(r'[?&]page=(\d+)>; rel="last"')
+
+async def _count_via_link(client, url):
+    """Count a list endpoint's items by requesting one per page and reading the last page number"""
+    response = await _cond_get(client, f"{url}?per_page=1")
+    if response.status_code != 200:
+        return 0
+
+    match = _LAST_PAGE_RE.search(response.headers.get("Link", ""))
+    if match:
+        return int(match.group(1))
+
+    # No pagination means everything fit on the single page
+    data = _json(response)
+    return len(data) if isinstance(data, list) else 0
+
+_GH_USER_RE = re.compile(r"^(?:https?://(?:www\.)?github\.com/)?([^/\s?#]+)/?(?:[?#].*)?$")
+
+def parse_username(s):
+    """Extract the GitHub username from a profile URL or bare username; None if it isn't one"""
+    m = _GH_USER_RE.match(s.strip())
+    return m.group(1) if m else None
+
+def get_github_headers():
+    """Build GitHub API request headers, adding the token when configured"""
     headers = {"Accept": "application/vnd.github.v3+json"}
     github_token = os.getenv("GITHUB_TOKEN")
     if github_token:
         headers["Authorization"] = f"Bearer {github_token}"
-    
-    total_commits = 0
+    return headers
+
+@st.cache_resource
+def get_http_client():
+    """Shared HTTP/2 client for synchronous GitHub calls; keeps one multiplexed connection alive"""
+    return httpx.Client(http2=True, timeout=10, headers=get_github_headers())
+
+GITHUB_MAX_IN_FLIGHT = 10  # Concurrent requests, to stay clear of GitHub's secondary rate limits
+
+async def _fetch_commit_changes(client, username, semaphore=None):
+    """Sum the user's contributions across their repos, fetching contributors concurrently.
+    Bulk runs pass one semaphore for every user so the in-flight bound is global, not per user"""
+    semaphore = semaphore or asyncio.Semaphore(GITHUB_MAX_IN_FLIGHT)
     try:
         repos_url = f"https://api.github.com/users/{username}/repos?per_page=100"
-        repos_response = requests.get(repos_url, headers=headers, timeout=10)
+        async with semaphore:
+            repos_response = await _cond_get(client, repos_url)
         repos_response.raise_for_status()
-        repositories = repos_response.json()
+        repositories = _json(repos_response)
 
-        for repo in repositories[:20]:  # Limit to first 20 repos for performance
+        async def _contrib(repo):
             owner = repo['owner']['login']
             repo_name = repo['name']
             contributors_url = f"https://api.github.com/repos/{owner}/{repo_name}/contributors"
             try:
-                contributors_response = requests.get(contributors_url, headers=headers, timeout=5)
+                async with semaphore:
+                    contributors_response = await _cond_get(client, contributors_url, timeout=5)
                 contributors_response.raise_for_status()
-                contributors = contributors_response.json()
-                
-                for contributor in contributors:
+                for contributor in _json(contributors_response):
                     if contributor['login'] == username:
-                        total_commits += contributor['contributions']
-                        break
-            except:
-                continue  # Skip repos that error out
+                        return contributor['contributions']
+            except Exception:
+                pass  # Skip repos that error out
+            return 0
 
-        return total_commits
+        # Limit to first 20 repos for performance
+        contributions = await asyncio.gather(*(_contrib(repo) for repo in repositories[:20]))
+        return sum(contributions)
     except Exception as e:
         st.warning(f"Error fetching commit data for {username}: {str(e)}")
         return 0
 
 @st.cache_data(ttl=300)  # Cache for 5 minutes
-def fetch_github_scores(username):
-    """Enhanced GitHub score fetching with better error handling"""
-    github_token = os.getenv("GITHUB_TOKEN")
-    headers = {
-        "Accept": "application/vnd.github.v3+json",
-        "Authorization": f"Bearer {github_token}" if github_token else ""
+def fetch_commit_changes(username):
+    """Fetch commit changes with caching"""
+    async def _run():
+        async with httpx.AsyncClient(http2=True, timeout=10, headers=get_github_headers()) as client:
+            return await _fetch_commit_changes(client, username)
+
+    return asyncio.run(_run())
+
+GITHUB_GRAPHQL_URL = "https://api.github.com/graphql"
+
+SCORE_COUNTS_FRAGMENT = """
+fragment ScoreCounts on User {
+  pullRequests { totalCount }
+  mergedPullRequests: pullRequests(states: MERGED) { totalCount }
+  issues { totalCount }
+  closedIssues: issues(states: CLOSED) { totalCount }
+  repositories(ownerAffiliations: OWNER, privacy: PUBLIC) { totalCount }
+  starredRepositories { totalCount }
+}
+"""
+
+SCORES_GRAPHQL_QUERY = """
+query($login: String!) {
+  user(login: $login) { ...ScoreCounts }
+}
+""" + SCORE_COUNTS_FRAGMENT
+
+# Aliased user lookups per bulk query; keeps each request well under GraphQL's node limit
+GRAPHQL_BATCH_SIZE = 50
+
+# Score key -> field alias in SCORE_COUNTS_FRAGMENT
+SCORES_GRAPHQL_FIELDS = {
+    "pull_requests_opened": "pullRequests",
+    "pull_requests_merged": "mergedPullRequests",
+    "issues_created": "issues",
+    "issues_closed": "closedIssues",
+    "repos_contributed_to": "repositories",
+    "starred_repositories": "starredRepositories",
+}
+
+async def _fetch_scores_graphql(client, username):
+    """Fetch all score counters in one GraphQL round-trip; returns None if unavailable"""
+    # The GraphQL API rejects unauthenticated requests
+    if "Authorization" not in client.headers:
+        return None
+
+    response = await client.post(
+        GITHUB_GRAPHQL_URL,
+        content=orjson.dumps({"query": SCORES_GRAPHQL_QUERY, "variables": {"login": username}}),
+        headers={"Content-Type": "application/json"}
+    )
+    if response.status_code != 200:
+        return None
+
+    # Partial failures come back as null fields next to "errors"; keep whatever resolved
+    user = (_json(response).get("data") or {}).get("user")
+    if not user:
+        return None
+    return _graphql_user_scores(user)
+
+def _graphql_user_scores(user):
+    """Map a ScoreCounts node to score keys; fields that failed to resolve are None"""
+    return {
+        field: (user.get(alias) or {}).get("totalCount")
+        for field, alias in SCORES_GRAPHQL_FIELDS.items()
     }
-    
-    if username.startswith("https://github.com/"):
-        username = username.split("https://github.com/")[-1].strip("/")
 
-    try:
-        # Use search API with rate limiting consideration
-        pr_opened = requests.get(
-            f"https://api.github.com/search/issues?q=type:pr+author:{username}&per_page=1",
-            headers=headers, timeout=10
-        ).json().get("total_count", 0)
-
-        pr_merged = requests.get(
-            f"https://api.github.com/search/issues?q=type:pr+author:{username}+is:merged&per_page=1",
-            headers=headers, timeout=10
-        ).json().get("total_count", 0)
-
-        issues_created = requests.get(
-            f"https://api.github.com/search/issues?q=type:issue+author:{username}&per_page=1",
-            headers=headers, timeout=10
-        ).json().get("total_count", 0)
-
-        issues_closed = requests.get(
-            f"https://api.github.com/search/issues?q=type:issue+author:{username}+is:closed&per_page=1",
-            headers=headers, timeout=10
-        ).json().get("total_count", 0)
-
-        repos_response = requests.get(
-            f"https://api.github.com/users/{username}/repos?per_page=100",
-            headers=headers, timeout=10
+async def _fetch_scores_graphql_bulk(client, usernames):
+    """Fetch score counters for many users with one aliased GraphQL query per batch"""
+    if "Authorization" not in client.headers:
+        return {}
+
+    async def _batch(batch):
+        params = ", ".join(f"$l{i}: String!" for i in range(len(batch)))
+        lookups = "\n".join(f"  u{i}: user(login: $l{i}) {{ ...ScoreCounts }}" for i in range(len(batch)))
+        response = await client.post(
+            GITHUB_GRAPHQL_URL,
+            content=orjson.dumps({
+                "query": f"query({params}) {{\n{lookups}\n}}\n" + SCORE_COUNTS_FRAGMENT,
+                "variables": {f"l{i}": username for i, username in enumerate(batch)}
+            }),
+            headers={"Content-Type": "application/json"}
         )
-        repos_data = repos_response.json() if repos_response.status_code == 200 else []
-        repos_contributed_to_count = len(repos_data) if isinstance(repos_data, list) else 0
+        if response.status_code != 200:
+            return {}
+        data = _json(response).get("data") or {}
+        return {
+            username: _graphql_user_scores(data[f"u{i}"])
+            for i, username in enumerate(batch) if data.get(f"u{i}")
+        }
+
+    batches = [usernames[i:i + GRAPHQL_BATCH_SIZE] for i in range(0, len(usernames), GRAPHQL_BATCH_SIZE)]
+    results = {}
+    for batch_scores in await asyncio.gather(*(_batch(batch) for batch in batches)):
+        results.update(batch_scores)
+    return results
+
+async def _search_count(client, query):
+    """Total hits for a /search/issues query, read from a single-item page"""
+    response = await _cond_get(client, f"https://api.github.com/search/issues?q={query}&per_page=1")
+    return _json(response).get("total_count", 0)
 
-        starred_response = requests.get(
-            f"https://api.github.com/users/{username}/starred?per_page=100",
-            headers=headers, timeout=10
+REST_SCORE_SOURCES = {
+    "pull_requests_opened": lambda client, u: _search_count(client, f"type:pr+author:{u}"),
+    "pull_requests_merged": lambda client, u: _search_count(client, f"type:pr+author:{u}+is:merged"),
+    "issues_created": lambda client, u: _search_count(client, f"type:issue+author:{u}"),
+    "issues_closed": lambda client, u: _search_count(client, f"type:issue+author:{u}+is:closed"),
+    "repos_contributed_to": lambda client, u: _count_via_link(client, f"https://api.github.com/users/{u}/repos"),
+    "starred_repositories": lambda client, u: _count_via_link(client, f"https://api.github.com/users/{u}/starred"),
+}
+
+async def _fetch_scores_rest(client, username, fields=None):
+    """Fetch the requested score counters (all by default) from the REST endpoints concurrently"""
+    fields = list(fields or REST_SCORE_SOURCES)
+    counts = await asyncio.gather(*(REST_SCORE_SOURCES[field](client, username) for field in fields))
+    return dict(zip(fields, counts))
+
+async def _fetch_scores(client, username):
+    """Prefer the single GraphQL query; only fields it could not resolve go to REST"""
+    try:
+        scores = await _fetch_scores_graphql(client, username)
+    except httpx.HTTPError:
+        scores = None
+    if scores is None:
+        return await _fetch_scores_rest(client, username)
+
+    missing = [field for field, value in scores.items() if value is None]
+    if missing:
+        scores.update(await _fetch_scores_rest(client, username, missing))
+    return scores
+
+async def _fetch_all(username, headers):
+    """Fetch the score counters and commit count concurrently over a single shared HTTP/2 client"""
+    async with httpx.AsyncClient(http2=True, timeout=10, headers=headers) as client:
+        scores, commit_changes = await asyncio.gather(
+            _fetch_scores(client, username),
+            _fetch_commit_changes(client, username)
         )
-        starred_data = starred_response.json() if starred_response.status_code == 200 else []
-        starred_repos_count = len(starred_data) if isinstance(starred_data, list) else 0
+    scores["commit_changes"] = commit_changes
+    return scores
 
-        commit_changes = fetch_commit_changes(username)
+async def _fetch_all_bulk(usernames, headers):
+    """Resolve many users' counters via bulk GraphQL, then their commit counts, on one client"""
+    async with httpx.AsyncClient(http2=True, timeout=10, headers=headers) as client:
+        try:
+            results = await _fetch_scores_graphql_bulk(client, usernames)
+        except httpx.HTTPError:
+            return {}
 
-        return {
-            "pull_requests_opened": pr_opened,
-            "pull_requests_merged": pr_merged,
-            "issues_created": issues_created,
-            "issues_closed": issues_closed,
-            "repos_contributed_to": repos_contributed_to_count,
-            "starred_repositories": starred_repos_count,
-            "commit_changes": commit_changes
-        }
+        # Shared by every user below, so the whole run keeps at most GITHUB_MAX_IN_FLIGHT requests open
+        semaphore = asyncio.Semaphore(GITHUB_MAX_IN_FLIGHT)
+
+        async def _complete(username, scores):
+            missing = [field for field, value in scores.items() if value is None]
+            if missing:
+                async with semaphore:
+                    scores.update(await _fetch_scores_rest(client, username, missing))
+            scores["commit_changes"] = await _fetch_commit_changes(client, username, semaphore)
+
+        await asyncio.gather(*(_complete(username, scores) for username, scores in results.items()))
+    return results
+
+@st.cache_data(ttl=600, show_spinner=False)
+def fetch_github_scores_bulk(usernames):
+    """Fetch scores for a tuple of users in a few GraphQL requests; users it can't resolve are omitted"""
+    try:
+        return asyncio.run(_fetch_all_bulk(list(usernames), get_github_headers()))
+    except Exception as e:
+        st.error(f"Error fetching GitHub data: {str(e)}")
+        return {}
+
+@st.cache_resource
+def _score_generations():
+    """Per-user cache generation for fetch_github_scores, shared by every session"""
+    return {}
+
+def bump_score_generation(username):
+    """Invalidate one user's cached scores without touching anyone else's"""
+    username = parse_username(username)
+    if username:
+        generations = _score_generations()
+        generations[username] = generations.get(username, 0) + 1
+
+@st.cache_data(ttl=600, max_entries=1024, show_spinner=False)  # Cache for 10 minutes
+def _fetch_github_scores_cached(username, generation):
+    """Cached score fetch; generation is part of the key so a bump forces a fresh fetch"""
+    try:
+        # All calls run concurrently; total latency is the slowest call
+        return asyncio.run(_fetch_all(username, get_github_headers()))
     except Exception as e:
         st.error(f"Error fetching GitHub data for {username}: {str(e)}")
         return None
 
+def fetch_github_scores(username):
+    """Enhanced GitHub score fetching with better error handling"""
+    username = parse_username(username)
+    if not username:
+        st.error("Invalid GitHub username or profile URL.")
+        return None
+    return _fetch_github_scores_cached(username, _score_generations().get(username, 0))
+
+def fetch_github_scores_many(usernames, max_workers=10):
+    """Fetch scores for many users on a bounded thread pool; returns {username: scores}"""
+    ctx = get_script_run_ctx()
+
+    def _fetch(username):
+        # Worker threads need the script context for the cache and any st.error output
+        add_script_run_ctx(threading.current_thread(), ctx)
+        return fetch_github_scores(username)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return dict(zip(usernames, executor.map(_fetch, usernames)))
+
+SCORE_KEYS = (
+    "pull_requests_opened", "pull_requests_merged", "issues_created", "issues_closed",
+    "repos_contributed_to", "starred_repositories", "commit_changes"
+)
+# Same weighting as the scores.total_score generated column
+SCORE_WEIGHTS = np.array([1, 2, 1, 2, 1, 1, 0.1])
+
+score_values = itemgetter(*SCORE_KEYS)
+
+# Profile "Detailed Performance Metrics" labels, in SCORE_KEYS order plus the total
+METRIC_TITLES = (
+    "Pull Requests Opened", "Pull Requests Merged", "Issues Created", "Issues Closed",
+    "Repositories", "Stars Given", "Total Commits", "Total Score"
+)
+METRIC_ICONS = ("🔀", "✅", "🐛", "✅", "📁", "⭐", "💻", "🏆")
+
+def weighted_total(scores):
+    """Leaderboard total for a scores dict as one dot product over SCORE_KEYS"""
+    values = np.fromiter((scores.get(key, 0) for key in SCORE_KEYS), dtype=np.float64, count=len(SCORE_KEYS))
+    return int(SCORE_WEIGHTS @ values)
+
+def leaderboard_matrix(usernames):
+    """Scores for many users as (names, matrix): one row per resolved user, columns in SCORE_KEYS order"""
+    users_scores = fetch_github_scores_bulk(tuple(usernames))
+    # Anyone the bulk query couldn't resolve (e.g. no token configured) goes through the per-user path
+    users_scores.update(fetch_github_scores_many([u for u in usernames if u not in users_scores]))
+
+    resolved = [u for u in usernames if users_scores.get(u)]
+    matrix = np.empty((len(resolved), len(SCORE_KEYS)), dtype=np.int64)
+    for row, username in enumerate(resolved):
+        scores = users_scores[username]
+        matrix[row] = [scores.get(key, 0) for key in SCORE_KEYS]
+    return np.array(resolved), matrix
+
 def update_scores_in_db(username, scores):
     """Enhanced score updating with activity logging"""
     try:
-        conn = connect_to_db()
-        if not conn:
-            return False, "Database connection failed"
-            
-        create_scores_table_if_not_exists(conn)
-        create_activity_log_table(conn)
-        cursor = conn.cursor()
+        with get_pool().connection() as conn, conn.pipeline(), conn.cursor() as cursor:
+            # Upsert and read the previous total in one round-trip; the CTE sees the pre-image
+            query = """
+                WITH prev AS (
+                    SELECT * FROM scores WHERE username = %s
+                )
+                INSERT INTO scores (
+                    username, pull_requests_opened, pull_requests_merged,
+                    issues_created, issues_closed, repos_contributed_to,
+                    starred_repositories, commit_changes, last_updated
+                )
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+                ON CONFLICT (username) DO UPDATE SET
+                    pull_requests_opened = EXCLUDED.pull_requests_opened,
+                    pull_requests_merged = EXCLUDED.pull_requests_merged,
+                    issues_created = EXCLUDED.issues_created,
+                    issues_closed = EXCLUDED.issues_closed,
+                    repos_contributed_to = EXCLUDED.repos_contributed_to,
+                    starred_repositories = EXCLUDED.starred_repositories,
+                    commit_changes = EXCLUDED.commit_changes,
+                    last_updated = EXCLUDED.last_updated
+                RETURNING
+                    (
+                        SELECT
+                            COALESCE(prev.pull_requests_opened, 0) +
+                            COALESCE(prev.pull_requests_merged, 0) * 2 +
+                            COALESCE(prev.issues_created, 0) +
+                            COALESCE(prev.issues_closed, 0) * 2 +
+                            COALESCE(prev.repos_contributed_to, 0) +
+                            COALESCE(prev.starred_repositories, 0) +
+                            FLOOR(COALESCE(prev.commit_changes, 0) * 0.1)::INT
+                        FROM prev
+                    ) AS old_total,
+                    scores.pull_requests_opened +
+                    scores.pull_requests_merged * 2 +  -- Weight merged PRs higher
+                    scores.issues_created +
+                    scores.issues_closed * 2 +  -- Weight closed issues higher
+                    scores.repos_contributed_to +
+                    scores.starred_repositories +
+                    FLOOR(scores.commit_changes * 0.1)::INT AS new_total;  -- Scale down commits
+            """
 
-        # Get previous score for comparison
-        cursor.execute("SELECT * FROM scores WHERE username = %s", (username,))
-        previous_data = cursor.fetchone()
-        
-        total_score = sum([
-            scores["pull_requests_opened"],
-            scores["pull_requests_merged"] * 2,  # Weight merged PRs higher
-            scores["issues_created"],
-            scores["issues_closed"] * 2,  # Weight closed issues higher
-            scores["repos_contributed_to"],
-            scores["starred_repositories"],
-            int(scores["commit_changes"] * 0.1)  # Scale down commits
-        ])
-
-        query = """
-            INSERT INTO scores (
-                username, pull_requests_opened, pull_requests_merged,
-                issues_created, issues_closed, repos_contributed_to,
-                starred_repositories, commit_changes, last_updated
-            )
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-            ON CONFLICT (username) DO UPDATE SET
-                pull_requests_opened = EXCLUDED.pull_requests_opened,
-                pull_requests_merged = EXCLUDED.pull_requests_merged,
-                issues_created = EXCLUDED.issues_created,
-                issues_closed = EXCLUDED.issues_closed,
-                repos_contributed_to = EXCLUDED.repos_contributed_to,
-                starred_repositories = EXCLUDED.starred_repositories,
-                commit_changes = EXCLUDED.commit_changes,
-                last_updated = EXCLUDED.last_updated;
-        """
-        
-        cursor.execute(query, (
-            username,
-            scores["pull_requests_opened"],
-            scores["pull_requests_merged"],
-            scores["issues_created"],
-            scores["issues_closed"],
-            scores["repos_contributed_to"],
-            scores["starred_repositories"],
-            scores["commit_changes"],
-            datetime.now()
-        ))
-
-        # Log activity if score changed
-        if previous_data:
-            previous_total = sum([
-                previous_data[2] or 0,  # pull_requests_opened
-                (previous_data[3] or 0) * 2,  # pull_requests_merged
-                previous_data[4] or 0,  # issues_created
-                (previous_data[5] or 0) * 2,  # issues_closed
-                previous_data[6] or 0,  # repos_contributed_to
-                previous_data[7] or 0,  # starred_repositories
-                int((previous_data[8] or 0) * 0.1)  # commit_changes
-            ])
-            score_change = total_score - previous_total
-            
-            if score_change != 0:
-                cursor.execute("""
-                    INSERT INTO activity_log (username, action, details, score_change)
-                    VALUES (%s, %s, %s, %s)
-                """, (username, 'scored', f'Score updated to {total_score}', score_change))
-                
-                # Add to live feed
-                simulate_live_activity(username, 'scored', f'Gained {score_change} points', score_change)
+            cursor.execute(query, (
+                username,
+                username,
+                scores["pull_requests_opened"],
+                scores["pull_requests_merged"],
+                scores["issues_created"],
+                scores["issues_closed"],
+                scores["repos_contributed_to"],
+                scores["starred_repositories"],
+                scores["commit_changes"],
+                datetime.now()
+            ))
+            previous_total, total_score = cursor.fetchone()
+
+            # Log activity if score changed
+            if previous_total is not None:
+                score_change = total_score - previous_total
+
+                if score_change != 0:
+                    cursor.execute("""
+                        INSERT INTO activity_log (username, action, details, score_change)
+                        VALUES (%s, %s, %s, %s)
+                    """, (username, 'scored', f'Score updated to {total_score}', score_change))
+
+                    # Add to live feed
+                    simulate_live_activity(username, 'scored', f'Gained {score_change} points', score_change)
 
-        conn.commit()
-        cursor.close()
-        conn.close()
         return True, "Scores updated successfully!"
     except Exception as e:
         return False, f"Database error: {str(e)}"
 
+LEADERBOARD_CACHE_KEY = "leaderboard:top100"
+
+def redis_cached(key, ttl=60, decode=None):
+    """Share a function's result across processes/replicas through Redis"""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            client = get_redis_client()
+            if client:
+                try:
+                    cached = client.get(key)
+                    if cached is not None:
+                        data = orjson.loads(cached)
+                        return decode(data) if decode else data
+                except redis.RedisError:
+                    pass
+
+            result = func(*args, **kwargs)
+
+            if client:
+                try:
+                    client.setex(key, ttl, orjson.dumps(result, default=_orjson_default))
+                except redis.RedisError:
+                    pass
+            return result
+        return wrapper
+    return decorator
+
+def invalidate_leaderboard_cache():
+    """Drop the leaderboard's cache tiers so the next read hits the database; other caches are untouched"""
+    st.session_state.pop("leaderboard_memo", None)
+    fetch_leaderboard.clear()
+    client = get_redis_client()
+    if client:
+        try:
+            client.delete(LEADERBOARD_CACHE_KEY)
+        except redis.RedisError:
+            pass
+
+REFRESH_LOCK_TTL = 30
+
+def acquire_refresh_lock(username):
+    """Claim the per-user refresh slot across replicas; True when this run should do the refresh"""
+    client = get_redis_client()
+    if not client:
+        return True
+    try:
+        return bool(client.set(f"refresh:{username}", 1, ex=REFRESH_LOCK_TTL, nx=True))
+    except redis.RedisError:
+        return True
+
+def release_refresh_lock(username):
+    """Free the refresh slot once the fetch has finished"""
+    client = get_redis_client()
+    if client:
+        try:
+            client.delete(f"refresh:{username}")
+        except redis.RedisError:
+            pass
+
+def _decode_leaderboard(data):
+    """Rebuild leaderboard rows and aggregates from their JSON form"""
+    rows, stats = data
+    return [
+        (username, score, github_url, datetime.fromisoformat(last_updated) if last_updated else None)
+        for username, score, github_url, last_updated in rows
+    ], tuple(stats)
+
+@redis_cached(LEADERBOARD_CACHE_KEY, ttl=60, decode=_decode_leaderboard)
+def _query_leaderboard():
+    """Read the top-100 rows and community-wide aggregates over one connection"""
+    with get_pool().connection() as conn:
+        # Server-side cursor: rows stream over in itersize batches instead of one client-side buffer
+        with conn.cursor(name="leaderboard_cur") as top:
+            top.itersize = 500
+            top.execute("""
+                SELECT s.username, s.total_score, g.github_url, s.last_updated
+                FROM scores s
+                LEFT JOIN github_accounts g ON s.username = g.username
+                ORDER BY s.total_score DESC
+                LIMIT 100
+            """)
+            rows = [tuple(row) for row in top]
+
+        with conn.cursor() as cursor:
+            cursor.execute("""
+                SELECT
+                    COUNT(*),
+                    COALESCE(SUM(total_score), 0),
+                    COALESCE(AVG(total_score), 0),
+                    COALESCE(MAX(total_score), 0),
+                    COUNT(*) FILTER (WHERE last_updated > LOCALTIMESTAMP - INTERVAL '1 day')
+                FROM scores;
+            """)
+            stats = cursor.fetchone()
+    return rows, stats
+
 @st.cache_data(ttl=60)  # Cache for 1 minute
 def fetch_leaderboard():
-    """Enhanced leaderboard fetching with caching"""
+    """Enhanced leaderboard fetching with caching; returns (rows, community stats)"""
     try:
-        conn = connect_to_db()
-        if not conn:
-            return []
-            
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT s.username, (
-                COALESCE(s.pull_requests_opened, 0) +
-                COALESCE(s.pull_requests_merged, 0) * 2 +
-                COALESCE(s.issues_created, 0) +
-                COALESCE(s.issues_closed, 0) * 2 +
-                COALESCE(s.repos_contributed_to, 0) +
-                COALESCE(s.starred_repositories, 0) +
-                COALESCE(s.commit_changes, 0) * 0.1
-            ) AS total_score, g.github_url, s.last_updated
-            FROM scores s
-            LEFT JOIN github_accounts g ON s.username = g.username
-            ORDER BY total_score DESC
-            LIMIT 100;
-        """)
-        rows = cursor.fetchall()
-        cursor.close()
-        conn.close()
-        return rows
+        return _query_leaderboard()
     except Exception as e:
         st.error(f"Error fetching leaderboard: {str(e)}")
-        return []
+        return [], None
+
+LEADERBOARD_MEMO_TTL = 60
+
+def session_leaderboard():
+    """fetch_leaderboard memoized in session_state, skipping the cache hash for repeat reads in a session"""
+    memo = st.session_state.get("leaderboard_memo")
+    if memo and time.time() - memo[0] < LEADERBOARD_MEMO_TTL:
+        return memo[1]
+    result = fetch_leaderboard()
+    if result[1] is not None:  # Don't pin a failed read for the whole TTL
+        st.session_state.leaderboard_memo = (time.time(), result)
+    return result
+
+@st.cache_data(ttl=60, show_spinner=False)
+def leaderboard_usernames():
+    """Leaderboard usernames in rank order, as a tuple for cheap selectbox option comparison"""
+    rows, _ = fetch_leaderboard()
+    return tuple(username for username, *_ in rows)
+
+# Argon2 tuned for the interactive login path; stronger and cheaper than werkzeug's 600k-round pbkdf2
+password_hasher = PasswordHasher(time_cost=2, memory_cost=65536, parallelism=2)
+
+def verify_password(password_hash, password):
+    """Verify a password, returning (valid, upgraded_hash) where upgraded_hash replaces stale hashes"""
+    if not password_hash.startswith("$argon2"):
+        # Legacy werkzeug pbkdf2 hash: verify once, then migrate to argon2
+        if check_password_hash(password_hash, password):
+            return True, password_hasher.hash(password)
+        return False, None
+
+    try:
+        password_hasher.verify(password_hash, password)
+    except (VerificationError, InvalidHashError):
+        return False, None
+
+    if password_hasher.check_needs_rehash(password_hash):
+        return True, password_hasher.hash(password)
+    return True, None
 
 def validate_login(username, password):
     """Enhanced login with last login tracking"""
     try:
-        conn = connect_to_db()
-        if not conn:
-            return False, "Database connection failed"
-            
-        cursor = conn.cursor()
-        cursor.execute("SELECT password_hash FROM github_accounts WHERE username = %s", (username,))
-        record = cursor.fetchone()
-        
-        if record and check_password_hash(record[0], password):
-            # Update last login
-            cursor.execute(
-                "UPDATE github_accounts SET last_login = %s WHERE username = %s",
-                (datetime.now(), username)
-            )
-            conn.commit()
-            cursor.close()
-            conn.close()
-            return True, "Login successful!"
-        
-        cursor.close()
-        conn.close()
+        with get_pool().connection() as conn, conn.cursor() as cursor:
+            cursor.execute("SELECT password_hash FROM github_accounts WHERE username = %s", (username,))
+            record = cursor.fetchone()
+
+            if record:
+                valid, upgraded_hash = verify_password(record[0], password)
+                if valid:
+                    # Update last login, migrating the password hash if needed
+                    cursor.execute(
+                        "UPDATE github_accounts SET last_login = %s, password_hash = COALESCE(%s, password_hash) WHERE username = %s",
+                        (datetime.now(), upgraded_hash, username)
+                    )
+                    return True, "Login successful!"
+
         return False, "Invalid username or password."
     except Exception as e:
         return False, f"Database error: {str(e)}"
 
+@st.cache_data(ttl=600, show_spinner=False)
+def fetch_profile_data(username):
+    """Revalidate the stored GitHub profile with its ETag; a 304 reuses the JSONB copy"""
+    try:
+        with get_pool().connection() as conn, conn.cursor() as cursor:
+            cursor.execute("SELECT profile_data FROM github_accounts WHERE username = %s", (username,))
+            row = cursor.fetchone()
+            stored = row[0] if row and row[0] else None
+
+            headers = {}
+            if stored and stored.get("_etag"):
+                headers["If-None-Match"] = stored["_etag"]
+            response = get_http_client().get(f"https://api.github.com/users/{username}", headers=headers)
+
+            if response.status_code == 304:
+                return parse_github_profile(stored, username)
+            if response.status_code != 200:
+                return None
+
+            profile_data = {**_json(response), "_etag": response.headers.get("ETag")}
+            if row is not None:
+                cursor.execute(
+                    "UPDATE github_accounts SET profile_data = %s WHERE username = %s",
+                    (orjson.dumps(profile_data).decode(), username)
+                )
+            return parse_github_profile(profile_data, username)
+    except Exception:
+        return None
+
 def sign_up(github_url, password):
     """Enhanced signup with profile data fetching"""
     try:
-        username = github_url.split("https://github.com/")[-1].strip("/")
-        
+        username = parse_username(github_url)
+        if not username:
+            return False, "Please enter a valid GitHub profile URL."
+
         # Validate GitHub account and fetch profile data
-        profile_response = requests.get(f"https://api.github.com/users/{username}", timeout=10)
+        profile_response = get_http_client().get(f"https://api.github.com/users/{username}")
         if profile_response.status_code != 200:
             return False, "GitHub account does not exist."
         
-        profile_data = profile_response.json()
+        profile_data = {**_json(profile_response), "_etag": profile_response.headers.get("ETag")}
 
-        conn = connect_to_db()
-        if not conn:
-            return False, "Database connection failed"
-            
-        create_accounts_table_if_not_exists(conn)
-        cursor = conn.cursor()
+        password_hash = password_hasher.hash(password)
+        try:
+            # Both inserts go out in one pipeline; the UNIQUE constraint replaces the existence check
+            with get_pool().connection() as conn, conn.pipeline(), conn.cursor() as cursor:
+                query = """
+                    INSERT INTO github_accounts (username, password_hash, github_url, profile_data)
+                    VALUES (%s, %s, %s, %s)
+                """
+                cursor.execute(query, (username, password_hash, github_url, orjson.dumps(profile_data).decode()))
 
-        cursor.execute("SELECT * FROM github_accounts WHERE username = %s", (username,))
-        if cursor.fetchone():
-            cursor.close()
-            conn.close()
+                # Log activity
+                cursor.execute("""
+                    INSERT INTO activity_log (username, action, details)
+                    VALUES (%s, %s, %s)
+                """, (username, 'joined', 'New user joined the leaderboard'))
+        except psycopg.errors.UniqueViolation:
             return False, "User already exists. Please log in."
 
-        password_hash = generate_password_hash(password)
-        query = """
-            INSERT INTO github_accounts (username, password_hash, github_url, profile_data)
-            VALUES (%s, %s, %s, %s)
-        """
-        cursor.execute(query, (username, password_hash, github_url, json.dumps(profile_data)))
-        
-        # Log activity
-        cursor.execute("""
-            INSERT INTO activity_log (username, action, details)
-            VALUES (%s, %s, %s)
-        """, (username, 'joined', 'New user joined the leaderboard'))
-        
-        conn.commit()
-        cursor.close()
-        conn.close()
-        
         # Add to live feed
         simulate_live_activity(username, 'joined', 'Welcome to the community!')
         
@@ -415,6 +875,204 @@ def sign_up(github_url, password):
     except Exception as e:
         return False, f"Error during sign-up: {str(e)}"
 
+@st.cache_resource
+def _achievement_css():
+    """Static styles for the Achievements page, built once per process"""
+    return """
+    <style>
+    .achievement-card {
+        background: var(--card-bg);
+        border-radius: 15px;
+        padding: 1.5rem;
+        margin: 1rem 0;
+        display: flex;
+        align-items: center;
+        border: 2px solid transparent;
+        transition: all 0.3s ease;
+    }
+    
+    .achievement-card.unlocked {
+        border-color: var(--success-color);
+        background: linear-gradient(135deg, rgba(0, 212, 170, 0.1), rgba(0, 184, 148, 0.1));
+    }
+    
+    .achievement-card.locked {
+        border-color: var(--border-color);
+        opacity: 0.7;
+    }
+    
+    .achievement-icon, .achievement-icon-locked {
+        font-size: 3rem;
+        margin-right: 1.5rem;
+    }
+    
+    .achievement-icon-locked {
+        filter: grayscale(100%);
+    }
+    
+    .achievement-info h4 {
+        margin: 0 0 0.5rem 0;
+        color: var(--text-color);
+    }
+    
+    .achievement-info p {
+        margin: 0 0 0.5rem 0;
+        color: var(--text-secondary);
+        font-size: 0.9rem;
+    }
+    
+    .progress-bar {
+        width: 100%;
+        height: 8px;
+        background: var(--border-color);
+        border-radius: 4px;
+        overflow: hidden;
+    }
+    
+    .progress-fill {
+        height: 100%;
+        background: linear-gradient(45deg, var(--primary-color), var(--secondary-color));
+        transition: width 0.3s ease;
+    }
+    </style>
+    """
+
+_TPL_UNLOCKED = """<div class="achievement-card unlocked">
+    <div class="achievement-icon">{icon}</div>
+    <div class="achievement-info">
+        <h4>{name}</h4>
+        <p>✅ Unlocked! ({current:,}/{threshold:,})</p>
+        <div class="progress-bar"><div class="progress-fill" style="width: 100%;"></div></div>
+    </div>
+</div>"""
+
+_TPL_LOCKED = """<div class="achievement-card locked">
+    <div class="achievement-icon-locked">{icon}</div>
+    <div class="achievement-info">
+        <h4>{name}</h4>
+        <p>{remaining:,} more to unlock ({current:,}/{threshold:,})</p>
+        <div class="progress-bar"><div class="progress-fill" style="width: {progress}%;"></div></div>
+    </div>
+</div>"""
+
+@lru_cache(maxsize=512)
+def render_achievement(name, icon, current, threshold, progress, remaining):
+    """Achievement card HTML; memoized since the same cards re-render on every rerun"""
+    if remaining == 0:
+        return _TPL_UNLOCKED.format(icon=icon, name=name, current=current, threshold=threshold)
+    return _TPL_LOCKED.format(
+        icon=icon, name=name, current=current, threshold=threshold,
+        remaining=remaining, progress=progress
+    )
+
+@st.fragment
+def _live_feed_panel():
+    """LiveFeed body; the refresh button reruns only this fragment, not the whole script"""
+    # Simulate some live activities for demo
+    if st.button("🔄 Refresh Live Data", type="primary"):
+        # Simulate new activities
+        users = ["alice", "bob", "charlie", "diana", "eve"]
+        actions = ["scored", "pull_request", "issue", "commit", "achievement"]
+        
+        for _ in range(3):
+            user = random.choice(users)
+            action = random.choice(actions)
+            score_change = random.randrange(5, 50) if action == "scored" else 0
+            details = f"Made awesome contributions!" if action == "scored" else f"Created new {action}"
+            simulate_live_activity(user, action, details, score_change)
+    
+    col1, col2 = st.columns([2, 1])
+    
+    with col1:
+        # Live activity feed
+        recent_activities = live_activity_feed.get_activities(20)
+        activity_html = live_activity_feed.create_activity_stream_html(recent_activities)
+        st.markdown(activity_html, unsafe_allow_html=True)
+    
+    with col2:
+        # Live statistics
+        st.markdown(live_stats.create_live_stats_html(), unsafe_allow_html=True)
+        
+        # Real-time notifications
+        if notification_system.notifications:
+            st.subheader("🔔 Recent Notifications")
+            for notification in notification_system.notifications[-3:]:
+                notification_html = notification_system.create_notification_html(notification)
+                st.markdown(notification_html, unsafe_allow_html=True)
+
+@st.fragment
+def _compare_panel(usernames):
+    """Compare form and results; a submit reruns only this fragment"""
+    # Picks are batched into one submit instead of a rerun per selectbox change
+    with st.form("compare"):
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            user1 = st.selectbox("Select First User", usernames, key="compare_user1")
+        with col2:
+            user2 = st.selectbox("Select Second User", usernames, key="compare_user2")
+        
+        submitted = st.form_submit_button("🔥 Start Comparison", type="primary", use_container_width=True)
+    
+    if submitted and user1 == user2:
+        st.warning("Pick two different users to compare.")
+    elif submitted:
+        with st.spinner("Analyzing performance..."):
+            analytics = get_analytics()
+            # Both users are fetched side by side; a double cache miss costs one round-trip, not two
+            compared = fetch_github_scores_many([user1, user2], max_workers=2)
+            user1_scores, user2_scores = compared[user1], compared[user2]
+
+            if user1_scores and user2_scores:
+                # Comparison chart
+                comparison_chart = analytics.create_comparison_chart(
+                    user1_scores, user2_scores, user1, user2
+                )
+                st.plotly_chart(comparison_chart, use_container_width=True)
+
+                # Side-by-side comparison
+                col1, col2 = st.columns(2)
+
+                with col1:
+                    st.subheader(f"👤 {user1}")
+                    user1_total = weighted_total(user1_scores)
+                    st.markdown(create_metric_card("Total Score", f"{user1_total:,}", "🏆"), unsafe_allow_html=True)
+
+                with col2:
+                    st.subheader(f"👤 {user2}")
+                    user2_total = weighted_total(user2_scores)
+                    st.markdown(create_metric_card("Total Score", f"{user2_total:,}", "🏆"), unsafe_allow_html=True)
+
+                # Winner announcement
+                if user1_total > user2_total:
+                    st.success(f"🏆 {user1} wins with {user1_total - user2_total:,} more points!")
+                elif user2_total > user1_total:
+                    st.success(f"🏆 {user2} wins with {user2_total - user1_total:,} more points!")
+                else:
+                    st.info("🤝 It's a tie! Both users have the same score.")
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _footer_html(theme):
+    """Footer markup; the timestamp advances once a minute so reruns reuse the same HTML"""
+    return f"""
+<div style='text-align: center; padding: 2rem; color: var(--text-secondary); font-size: 0.9rem;'>
+    <div style='margin-bottom: 1rem;'>
+        <strong>🚀 GitHub Leaderboard Pro</strong> - Next-Generation Developer Community Platform
+    </div>
+    <div style='display: flex; justify-content: center; gap: 2rem; flex-wrap: wrap;'>
+        <span>💻 Built with Streamlit & AI</span>
+        <span>📊 Real-time Analytics</span>
+        <span>🤖 ML-Powered Insights</span>
+        <span>🎯 Achievement System</span>
+        <span>⚡ Live Updates</span>
+    </div>
+    <div style='margin-top: 1rem; font-size: 0.8rem;'>
+        Current Theme: <strong>{theme.title()}</strong> | 
+        Last Updated: <strong>{datetime.now():%Y-%m-%d %H:%M}</strong>
+    </div>
+</div>
+"""
+
 # Initialize session state
 if "page" not in st.session_state:
     st.session_state.page = "Login"
@@ -422,6 +1080,8 @@ if "current_user" not in st.session_state:
     st.session_state.current_user = None
 if "user_data" not in st.session_state:
     st.session_state.user_data = None
+if "refresh_inflight" not in st.session_state:
+    st.session_state.refresh_inflight = False
 
 # Enhanced Sidebar with theme selection
 with st.sidebar:
@@ -470,18 +1130,31 @@ with st.sidebar:
         
         # Quick actions
         if st.button("🔄 Refresh My Scores", use_container_width=True):
-            with st.spinner("Updating your scores..."):
-                scores = fetch_github_scores(st.session_state.current_user)
-                if scores:
-                    success, msg = update_scores_in_db(st.session_state.current_user, scores)
-                    if success:
-                        st.success("Scores updated!")
-                        st.cache_data.clear()  # Clear cache to show updated data
-                        st.rerun()
-                    else:
-                        st.error(msg)
-                else:
-                    st.error("Failed to fetch GitHub data")
+            user = st.session_state.current_user
+            # Coalesce repeated clicks in this session and concurrent refreshes on other replicas
+            if st.session_state.refresh_inflight or not acquire_refresh_lock(user):
+                st.info("Already refreshing — please wait")
+            else:
+                st.session_state.refresh_inflight = True
+                try:
+                    with st.spinner("Updating your scores..."):
+                        bump_score_generation(user)  # An explicit refresh must bypass this user's cached scores
+                        scores = fetch_github_scores(user)
+                        if scores:
+                            success, msg = update_scores_in_db(user, scores)
+                            if success:
+                                st.success("Scores updated!")
+                                invalidate_leaderboard_cache()  # Clear cache to show updated data
+                            else:
+                                st.error(msg)
+                        else:
+                            st.error("Failed to fetch GitHub data")
+                            success = False
+                finally:
+                    st.session_state.refresh_inflight = False
+                    release_refresh_lock(user)
+                if success:
+                    st.rerun()
         
         if st.button("🚪 Logout", use_container_width=True):
             st.session_state.page = "Login"
@@ -493,7 +1166,7 @@ with st.sidebar:
     # Live stats in sidebar
     if st.session_state.page in ["Dashboard", "Profile", "Analytics", "LiveFeed"]:
         st.markdown("### 📡 Live Stats")
-        live_stats.stats['online_users'] = np.random.randint(45, 85)  # Simulate online users
+        live_stats.stats['online_users'] = random.randint(45, 85)  # Simulate online users
         st.markdown(live_stats.create_live_stats_html(), unsafe_allow_html=True)
 
 # Main content based on current page
@@ -586,6 +1259,7 @@ if st.session_state.page == "Login":
             st.markdown('</div>', unsafe_allow_html=True)
 
 elif st.session_state.page == "Dashboard":
+    analytics = get_analytics()
     st.markdown(create_header("🏆 GitHub Leaderboard Pro", "Elite Developer Community Dashboard"), unsafe_allow_html=True)
     
     # Auto-refresh mechanism
@@ -599,7 +1273,7 @@ elif st.session_state.page == "Dashboard":
     
     # Fetch and update leaderboard data
     with st.spinner("Loading leaderboard data..."):
-        leaderboard = fetch_leaderboard()
+        leaderboard, leaderboard_stats = session_leaderboard()
     
     # Main dashboard layout
     col1, col2 = st.columns([2.5, 1.5])
@@ -609,27 +1283,22 @@ elif st.session_state.page == "Dashboard":
         
         if leaderboard:
             # Enhanced leaderboard display with animations
+            now = datetime.now()
+            items = []
             for i, (username, score, github_url, last_updated) in enumerate(leaderboard[:15], 1):
                 time_since_update = ""
                 if last_updated:
-                    time_diff = datetime.now() - last_updated
-                    if time_diff.days > 0:
-                        time_since_update = f" • Updated {time_diff.days}d ago"
-                    elif time_diff.seconds > 3600:
-                        time_since_update = f" • Updated {time_diff.seconds//3600}h ago"
+                    age_seconds = int((now - last_updated).total_seconds())
+                    if age_seconds >= 86400:
+                        time_since_update = f" • Updated {age_seconds // 86400}d ago"
+                    elif age_seconds > 3600:
+                        time_since_update = f" • Updated {age_seconds // 3600}h ago"
                     else:
-                        time_since_update = f" • Updated {time_diff.seconds//60}m ago"
-                
-                enhanced_item = create_leaderboard_item(i, username, int(score), github_url)
-                # Add update time info
-                enhanced_item = enhanced_item.replace(
-                    f'<div class="username">', 
-                    f'<div class="username">'
-                ).replace(
-                    '</div>        </div>',
-                    f'{time_since_update}</div>        </div>'
-                )
-                st.markdown(enhanced_item, unsafe_allow_html=True)
+                        time_since_update = f" • Updated {age_seconds // 60}m ago"
+
+                items.append(create_leaderboard_item(i, username, int(score), github_url, suffix=time_since_update).strip())
+            # One markdown element for the whole list instead of one delta per row
+            st.markdown("\n".join(items), unsafe_allow_html=True)
             
             # Create enhanced leaderboard chart
             if len(leaderboard) > 1:
@@ -643,11 +1312,8 @@ elif st.session_state.page == "Dashboard":
         st.subheader("📊 Live Community Stats")
         
         if leaderboard:
-            total_users = len(leaderboard)
-            total_score = sum([user[1] for user in leaderboard])
-            avg_score = total_score / total_users if total_users > 0 else 0
-            top_score = leaderboard[0][1] if leaderboard else 0
-            active_today = len([user for user in leaderboard if user[3] and (datetime.now() - user[3]).days == 0])
+            # Aggregates are computed in SQL alongside the leaderboard rows
+            total_users, total_score, avg_score, top_score, active_today = leaderboard_stats
             
             # Enhanced stats with progress rings
             stats_data = [
@@ -674,6 +1340,7 @@ elif st.session_state.page == "Dashboard":
                 st.plotly_chart(community_chart, use_container_width=True, height=400)
 
 elif st.session_state.page == "Profile":
+    analytics = get_analytics()
     if st.session_state.current_user:
         username = st.session_state.current_user
         st.markdown(create_header(f"👤 {username}'s Elite Profile", "Personal Analytics & Performance Dashboard"), unsafe_allow_html=True)
@@ -681,10 +1348,10 @@ elif st.session_state.page == "Profile":
         # Fetch comprehensive user data
         with st.spinner("Loading your elite profile..."):
             scores = fetch_github_scores(username)
-            profile_data = fetch_github_profile_data(username)
+            profile_data = fetch_profile_data(username)
             
             # Get user rank
-            leaderboard = fetch_leaderboard()
+            leaderboard, _ = session_leaderboard()
             user_rank = None
             for i, (user, score, _, _) in enumerate(leaderboard, 1):
                 if user == username:
@@ -738,62 +1405,49 @@ elif st.session_state.page == "Profile":
                 # Detailed metrics with enhanced styling
                 st.subheader("📊 Detailed Performance Metrics")
                 
-                metrics_col1, metrics_col2 = st.columns(2)
-                
-                metrics_data = [
-                    ("Pull Requests Opened", scores.get('pull_requests_opened', 0), "🔀"),
-                    ("Pull Requests Merged", scores.get('pull_requests_merged', 0), "✅"),
-                    ("Issues Created", scores.get('issues_created', 0), "🐛"),
-                    ("Issues Closed", scores.get('issues_closed', 0), "✅"),
-                    ("Repositories", scores.get('repos_contributed_to', 0), "📁"),
-                    ("Stars Given", scores.get('starred_repositories', 0), "⭐"),
-                    ("Total Commits", scores.get('commit_changes', 0), "💻"),
-                    ("Total Score", insights_report['total_score'], "🏆")
-                ]
+                for key in SCORE_KEYS:
+                    scores.setdefault(key, 0)
+                metrics_data = zip(METRIC_TITLES, score_values(scores) + (insights_report['total_score'],), METRIC_ICONS)
                 
-                for i, (title, value, icon) in enumerate(metrics_data):
-                    col = metrics_col1 if i % 2 == 0 else metrics_col2
-                    with col:
-                        st.markdown(create_metric_card(title, f"{value:,}", icon), unsafe_allow_html=True)
+                # Two-column CSS grid in one markdown element instead of eight calls across st.columns
+                metrics_html = "\n".join(create_metric_card(title, f"{value:,}", icon).strip() for title, value, icon in metrics_data)
+                st.markdown(
+                    f'<div style="display: grid; grid-template-columns: 1fr 1fr; gap: 1rem;">\n{metrics_html}\n</div>',
+                    unsafe_allow_html=True
+                )
         else:
             st.error("Failed to load profile data. Please try refreshing your scores.")
     else:
         st.error("Please log in to view your profile.")
 
 elif st.session_state.page == "Analytics":
+    analytics = get_analytics()
     st.markdown(create_header("📊 Advanced Analytics Hub", "Deep Insights & Data Intelligence"), unsafe_allow_html=True)
     
     # Fetch all user data for ML analysis
-    leaderboard = fetch_leaderboard()
+    leaderboard, _ = session_leaderboard()
     
     if len(leaderboard) >= 3:
         # Prepare data for ML clustering
-        all_users_data = []
-        for username, _, _, _ in leaderboard:
-            user_scores = fetch_github_scores(username)
-            if user_scores:
-                user_scores['username'] = username
-                all_users_data.append(user_scores)
+        usernames, score_matrix = leaderboard_matrix([username for username, _, _, _ in leaderboard])
         
         col1, col2 = st.columns(2)
         
         with col1:
             st.subheader("🤖 AI-Powered User Segmentation")
-            if len(all_users_data) >= 3:
-                clustering_result = analytics.perform_user_clustering(all_users_data)
+            if len(usernames) >= 3:
+                clustering_result = analytics.perform_user_clustering(usernames, score_matrix)
                 if clustering_result:
                     cluster_chart, clusters, cluster_names = clustering_result
                     st.plotly_chart(cluster_chart, use_container_width=True)
                     
                     # Show cluster distribution
-                    cluster_counts = {}
-                    for i, cluster in enumerate(clusters):
-                        cluster_name = cluster_names[cluster % len(cluster_names)]
-                        cluster_counts[cluster_name] = cluster_counts.get(cluster_name, 0) + 1
+                    cluster_counts = np.bincount(clusters % len(cluster_names), minlength=len(cluster_names))
                     
                     st.subheader("🎯 Segment Distribution")
-                    for name, count in cluster_counts.items():
-                        st.markdown(create_metric_card(name, count, "👥"), unsafe_allow_html=True)
+                    for name, count in zip(cluster_names, cluster_counts):
+                        if count:
+                            st.markdown(create_metric_card(name, int(count), "👥"), unsafe_allow_html=True)
         
         with col2:
             st.subheader("🌍 Community Insights")
@@ -812,101 +1466,15 @@ elif st.session_state.page == "Analytics":
 elif st.session_state.page == "LiveFeed":
     st.markdown(create_header("📡 Live Activity Feed", "Real-time Community Updates"), unsafe_allow_html=True)
     
-    # Simulate some live activities for demo
-    if st.button("🔄 Refresh Live Data", type="primary"):
-        # Simulate new activities
-        users = ["alice", "bob", "charlie", "diana", "eve"]
-        actions = ["scored", "pull_request", "issue", "commit", "achievement"]
-        
-        for _ in range(3):
-            user = np.random.choice(users)
-            action = np.random.choice(actions)
-            score_change = np.random.randint(5, 50) if action == "scored" else 0
-            details = f"Made awesome contributions!" if action == "scored" else f"Created new {action}"
-            simulate_live_activity(user, action, details, score_change)
-    
-    col1, col2 = st.columns([2, 1])
-    
-    with col1:
-        # Live activity feed
-        recent_activities = live_activity_feed.get_activities(20)
-        activity_html = live_activity_feed.create_activity_stream_html(recent_activities)
-        st.markdown(activity_html, unsafe_allow_html=True)
-    
-    with col2:
-        # Live statistics
-        st.markdown(live_stats.create_live_stats_html(), unsafe_allow_html=True)
-        
-        # Real-time notifications
-        if notification_system.notifications:
-            st.subheader("🔔 Recent Notifications")
-            for notification in notification_system.notifications[-3:]:
-                notification_html = notification_system.create_notification_html(notification)
-                st.markdown(notification_html, unsafe_allow_html=True)
+    _live_feed_panel()
 
 elif st.session_state.page == "Compare":
     st.markdown(create_header("⚡ User Comparison Arena", "Head-to-Head Performance Analysis"), unsafe_allow_html=True)
     
-    leaderboard = fetch_leaderboard()
-    usernames = [user[0] for user in leaderboard]
+    usernames = leaderboard_usernames()
     
     if len(usernames) >= 2:
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            user1 = st.selectbox("Select First User", usernames, key="compare_user1")
-        with col2:
-            user2 = st.selectbox("Select Second User", usernames, key="compare_user2")
-        
-        if user1 and user2 and user1 != user2:
-            if st.button("🔥 Start Comparison", type="primary", use_container_width=True):
-                with st.spinner("Analyzing performance..."):
-                    user1_scores = fetch_github_scores(user1)
-                    user2_scores = fetch_github_scores(user2)
-                    
-                    if user1_scores and user2_scores:
-                        # Comparison chart
-                        comparison_chart = analytics.create_comparison_chart(
-                            user1_scores, user2_scores, user1, user2
-                        )
-                        st.plotly_chart(comparison_chart, use_container_width=True)
-                        
-                        # Side-by-side comparison
-                        col1, col2 = st.columns(2)
-                        
-                        with col1:
-                            st.subheader(f"👤 {user1}")
-                            user1_total = sum([
-                                user1_scores.get('pull_requests_opened', 0),
-                                user1_scores.get('pull_requests_merged', 0) * 2,
-                                user1_scores.get('issues_created', 0),
-                                user1_scores.get('issues_closed', 0) * 2,
-                                user1_scores.get('repos_contributed_to', 0),
-                                user1_scores.get('starred_repositories', 0),
-                                int(user1_scores.get('commit_changes', 0) * 0.1)
-                            ])
-                            st.markdown(create_metric_card("Total Score", f"{user1_total:,}", "🏆"), unsafe_allow_html=True)
-                        
-                        with col2:
-                            st.subheader(f"👤 {user2}")
-                            user2_total = sum([
-                                user2_scores.get('pull_requests_opened', 0),
-                                user2_scores.get('pull_requests_merged', 0) * 2,
-                                user2_scores.get('issues_created', 0),
-                                user2_scores.get('issues_closed', 0) * 2,
-                                user2_scores.get('repos_contributed_to', 0),
-                                user2_scores.get('starred_repositories', 0),
-                                int(user2_scores.get('commit_changes', 0) * 0.1)
-                            ])
-                            st.markdown(create_metric_card("Total Score", f"{user2_total:,}", "🏆"), unsafe_allow_html=True)
-                        
-                        # Winner announcement
-                        if user1_total > user2_total:
-                            st.success(f"🏆 {user1} wins with {user1_total - user2_total:,} more points!")
-                        elif user2_total > user1_total:
-                            st.success(f"🏆 {user2} wins with {user2_total - user1_total:,} more points!")
-                        else:
-                            st.info("🤝 It's a tie! Both users have the same score.")
+        _compare_panel(usernames)
     else:
         st.info("Need at least 2 users for comparison. Invite more developers!")
 
@@ -916,6 +1484,9 @@ elif st.session_state.page == "Achievements":
     if st.session_state.current_user:
         scores = fetch_github_scores(st.session_state.current_user)
         if scores:
+            # Achievement progress styles
+            st.markdown(_achievement_css(), unsafe_allow_html=True)
+
             # All possible achievements
             all_achievements = [
                 {"name": "PR Master", "icon": "🔀", "threshold": 50, "current": scores.get('pull_requests_merged', 0), "type": "pull_requests_merged"},
@@ -927,126 +1498,35 @@ elif st.session_state.page == "Achievements":
                 {"name": "PR Opener", "icon": "📤", "threshold": 100, "current": scores.get('pull_requests_opened', 0), "type": "pull_requests_opened"},
             ]
             
+            # Progress for every achievement in one vectorized pass
+            current = np.array([a["current"] for a in all_achievements])
+            threshold = np.array([a["threshold"] for a in all_achievements])
+            unlocked_mask = current >= threshold
+            progress = np.clip(current / threshold * 100, 0, 100)
+            remaining = np.maximum(threshold - current, 0)
+            cards = [
+                render_achievement(a["name"], a["icon"], cur, thr, pct, rem)
+                for a, cur, thr, pct, rem in zip(
+                    all_achievements, current.tolist(), threshold.tolist(), progress.tolist(), remaining.tolist()
+                )
+            ]
+            
             col1, col2 = st.columns(2)
             
             with col1:
                 st.subheader("🎯 Unlocked Achievements")
-                unlocked_count = 0
-                for achievement in all_achievements:
-                    if achievement["current"] >= achievement["threshold"]:
-                        unlocked_count += 1
-                        progress_percentage = 100
-                        st.markdown(f"""
-                        <div class="achievement-card unlocked">
-                            <div class="achievement-icon">{achievement["icon"]}</div>
-                            <div class="achievement-info">
-                                <h4>{achievement["name"]}</h4>
-                                <p>✅ Unlocked! ({achievement["current"]:,}/{achievement["threshold"]:,})</p>
-                                <div class="progress-bar"><div class="progress-fill" style="width: 100%;"></div></div>
-                            </div>
-                        </div>
-                        """, unsafe_allow_html=True)
-                
-                if unlocked_count == 0:
+                if unlocked_mask.any():
+                    st.markdown("\n".join(card for card, done in zip(cards, unlocked_mask) if done), unsafe_allow_html=True)
+                else:
                     st.info("🎯 Start contributing to unlock your first achievement!")
             
             with col2:
                 st.subheader("🔓 Locked Achievements")
-                for achievement in all_achievements:
-                    if achievement["current"] < achievement["threshold"]:
-                        progress_percentage = (achievement["current"] / achievement["threshold"]) * 100
-                        remaining = achievement["threshold"] - achievement["current"]
-                        st.markdown(f"""
-                        <div class="achievement-card locked">
-                            <div class="achievement-icon-locked">{achievement["icon"]}</div>
-                            <div class="achievement-info">
-                                <h4>{achievement["name"]}</h4>
-                                <p>{remaining:,} more to unlock ({achievement["current"]:,}/{achievement["threshold"]:,})</p>
-                                <div class="progress-bar"><div class="progress-fill" style="width: {progress_percentage}%;"></div></div>
-                            </div>
-                        </div>
-                        """, unsafe_allow_html=True)
-            
-            # Achievement progress styles
-            st.markdown("""
-            <style>
-            .achievement-card {
-                background: var(--card-bg);
-                border-radius: 15px;
-                padding: 1.5rem;
-                margin: 1rem 0;
-                display: flex;
-                align-items: center;
-                border: 2px solid transparent;
-                transition: all 0.3s ease;
-            }
-            
-            .achievement-card.unlocked {
-                border-color: var(--success-color);
-                background: linear-gradient(135deg, rgba(0, 212, 170, 0.1), rgba(0, 184, 148, 0.1));
-            }
-            
-            .achievement-card.locked {
-                border-color: var(--border-color);
-                opacity: 0.7;
-            }
-            
-            .achievement-icon, .achievement-icon-locked {
-                font-size: 3rem;
-                margin-right: 1.5rem;
-            }
-            
-            .achievement-icon-locked {
-                filter: grayscale(100%);
-            }
-            
-            .achievement-info h4 {
-                margin: 0 0 0.5rem 0;
-                color: var(--text-color);
-            }
-            
-            .achievement-info p {
-                margin: 0 0 0.5rem 0;
-                color: var(--text-secondary);
-                font-size: 0.9rem;
-            }
-            
-            .progress-bar {
-                width: 100%;
-                height: 8px;
-                background: var(--border-color);
-                border-radius: 4px;
-                overflow: hidden;
-            }
-            
-            .progress-fill {
-                height: 100%;
-                background: linear-gradient(45deg, var(--primary-color), var(--secondary-color));
-                transition: width 0.3s ease;
-            }
-            </style>
-            """, unsafe_allow_html=True)
+                if not unlocked_mask.all():
+                    st.markdown("\n".join(card for card, done in zip(cards, unlocked_mask) if not done), unsafe_allow_html=True)
     else:
         st.error("Please log in to view achievements.")
 
 # Footer with additional info
 st.markdown("---")
-footer_html = f"""
-<div style='text-align: center; padding: 2rem; color: var(--text-secondary); font-size: 0.9rem;'>
-    <div style='margin-bottom: 1rem;'>
-        <strong>🚀 GitHub Leaderboard Pro</strong> - Next-Generation Developer Community Platform
-    </div>
-    <div style='display: flex; justify-content: center; gap: 2rem; flex-wrap: wrap;'>
-        <span>💻 Built with Streamlit & AI</span>
-        <span>📊 Real-time Analytics</span>
-        <span>🤖 ML-Powered Insights</span>
-        <span>🎯 Achievement System</span>
-        <span>⚡ Live Updates</span>
-    </div>
-    <div style='margin-top: 1rem; font-size: 0.8rem;'>
-        Current Theme: <strong>{st.session_state.theme.title()}</strong> | 
-        Last Updated: <strong>{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</strong>
-    </div>
-</div>
-"""
-st.markdown(footer_html, unsafe_allow_html=True)
+st.markdown(_footer_html(st.session_state.theme), unsafe_allow_html=True)
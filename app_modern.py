@@ -1,19 +1,31 @@
 import streamlit as st
 import requests
-import psycopg
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from cachetools import TTLCache
+import threading
+import itertools
+import orjson
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+from psycopg.conninfo import make_conninfo
+from psycopg_pool import ConnectionPool
 import os
 import pandas as pd
 from datetime import datetime
 from dotenv import load_dotenv
-from werkzeug.security import generate_password_hash, check_password_hash
+from werkzeug.security import check_password_hash
+from argon2 import PasswordHasher
+from argon2.exceptions import VerificationError, InvalidHashError
 
 # Import our custom components
 from styles.modern_ui import apply_modern_theme, create_header, create_metric_card, create_leaderboard_item, create_stats_grid
+from utils.background_tasks import start_background_scheduler
 from components.dashboard import (
     create_user_analytics_chart, 
     create_leaderboard_chart, 
     create_activity_timeline,
-    fetch_github_profile_data,
+    parse_github_profile,
     create_user_profile_card,
     create_achievement_badges
 )
@@ -36,15 +48,22 @@ DB_PASSWORD = os.getenv("DB_PASSWORD")
 DB_HOST = os.getenv("DB_HOST")
 DB_PORT = os.getenv("DB_PORT")
 
+# Comma-separated pool of tokens, each with its own hourly quota; GITHUB_TOKEN still works on its own
+GITHUB_TOKENS = [t.strip() for t in os.getenv("GITHUB_TOKENS", os.getenv("GITHUB_TOKEN", "")).split(",") if t.strip()]
+_token_cycle = itertools.cycle(GITHUB_TOKENS)
+
 # Database functions (keeping your existing ones)
-def connect_to_db():
-    return psycopg.connect(
+# One pool per process; connections are reused across reruns instead of reconnecting per query
+@st.cache_resource
+def get_pool():
+    conninfo = make_conninfo(
         dbname=DB_NAME,
         user=DB_USER,
         password=DB_PASSWORD,
         host=DB_HOST,
         port=DB_PORT,
     )
+    return ConnectionPool(conninfo=conninfo, min_size=2, max_size=10, kwargs={"autocommit": False}, open=True)
 
 def create_accounts_table_if_not_exists(conn):
     cursor = conn.cursor()
@@ -77,176 +96,496 @@ def create_scores_table_if_not_exists(conn):
     );
     """
     cursor.execute(create_table_query)
+    # Leaderboard score kept up to date by Postgres so ranking is an index scan, not a sort
+    cursor.execute("""
+        ALTER TABLE scores ADD COLUMN IF NOT EXISTS contribution_total INT GENERATED ALWAYS AS (
+            COALESCE(pull_requests_opened, 0) +
+            COALESCE(pull_requests_merged, 0) +
+            COALESCE(issues_created, 0) +
+            COALESCE(issues_closed, 0) +
+            COALESCE(repos_contributed_to, 0) +
+            COALESCE(starred_repositories, 0) +
+            COALESCE(commit_changes, 0)
+        ) STORED;
+    """)
+    # Copy of github_accounts.github_url, written with the scores so the leaderboard needs no join
+    cursor.execute("ALTER TABLE scores ADD COLUMN IF NOT EXISTS github_url TEXT;")
+    # Covering index: the top-K read comes straight from the index
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_scores_leaderboard
+        ON scores (contribution_total DESC) INCLUDE (username, github_url);
+    """)
     conn.commit()
 
-def fetch_commit_changes(username):
+# One pooled keep-alive session for every GitHub call; transient 5xx responses are retried with backoff
+@st.cache_resource
+def get_github_session():
+    session = requests.Session()
+    retries = Retry(total=3, backoff_factor=0.3, status_forcelist=[502, 503, 504], allowed_methods=None)
+    session.mount("https://", HTTPAdapter(pool_connections=32, pool_maxsize=32, max_retries=retries))
+    return session
+
+# Last 200 response per URL, replayed when GitHub answers 304 (which doesn't count against the rate limit)
+@st.cache_resource
+def get_etag_store():
+    return TTLCache(maxsize=4096, ttl=24 * 3600), threading.Lock()
+
+def _rate_limited(response):
+    return response.status_code == 429 or (
+        response.status_code == 403 and response.headers.get("X-RateLimit-Remaining") == "0"
+    )
+
+# Last X-RateLimit-Remaining seen per token ("" when unauthenticated), shared by every thread
+@st.cache_resource
+def _rate_limit_remaining():
+    return {}
+
+# Requests left across the token pool, or None before any response has reported it
+def github_budget():
+    remaining = _rate_limit_remaining()
+    return sum(remaining.values()) if remaining else None
+
+# Round-robin the token pool per request; a rate-limited token hands over to the next one
+def github_request(method, url, headers, **kwargs):
+    for _ in range(max(len(GITHUB_TOKENS), 1)):
+        request_headers = dict(headers)
+        token = next(_token_cycle) if GITHUB_TOKENS else ""
+        if token:
+            request_headers["Authorization"] = f"Bearer {token}"
+        response = get_github_session().request(method, url, headers=request_headers, timeout=10, **kwargs)
+        if "X-RateLimit-Remaining" in response.headers:
+            _rate_limit_remaining()[token] = int(response.headers["X-RateLimit-Remaining"])
+        if not _rate_limited(response):
+            break
+    return response
+
+def github_get(url, headers):
+    store, lock = get_etag_store()
+    with lock:
+        cached = store.get(url)
+    conditional = {**headers, "If-None-Match": cached.headers["ETag"]} if cached else headers
+    response = github_request("GET", url, conditional)
+
+    if response.status_code == 304 and cached:
+        return cached
+    if response.status_code == 200 and response.headers.get("ETag"):
+        with lock:
+            store[url] = response
+    return response
+
+# Decode a GitHub response body with orjson instead of the stdlib json behind Response.json()
+def _json(response):
+    return orjson.loads(response.content)
+
+# Walk a list endpoint 100 items per page, following the Link rel="next" header
+def github_paged(url, headers):
+    url = f"{url}{'&' if '?' in url else '?'}per_page=100"
+    while url:
+        response = github_get(url, headers)
+        response.raise_for_status()
+        yield from _json(response)
+        url = response.links.get("next", {}).get("url")
+
+GITHUB_GRAPHQL_URL = "https://api.github.com/graphql"
+
+USER_ID_QUERY = """
+query($login: String!) {
+  user(login: $login) { id }
+}
+"""
+
+COMMIT_HISTORY_QUERY = """
+query($login: String!, $uid: ID!, $cursor: String) {
+  user(login: $login) {
+    repositories(first: 100, after: $cursor, ownerAffiliations: OWNER) {
+      pageInfo { hasNextPage endCursor }
+      nodes {
+        defaultBranchRef {
+          target { ... on Commit { history(author: {id: $uid}) { totalCount } } }
+        }
+      }
+    }
+  }
+}
+"""
+
+def run_graphql(query, variables, headers):
+    response = github_request("POST", GITHUB_GRAPHQL_URL, headers, json={"query": query, "variables": variables})
+    response.raise_for_status()
+    payload = _json(response)
+    if payload.get("errors"):
+        raise RuntimeError(payload["errors"][0].get("message", "GraphQL error"))
+    return payload["data"]
+
+# Commits authored by the user on the default branch of each repo they own, 100 repos per request
+def fetch_commit_changes_gql(username, headers):
+    user = run_graphql(USER_ID_QUERY, {"login": username}, headers)["user"]
+    if not user:
+        return 0
+
+    total_commits = 0
+    cursor = None
+    while True:
+        repositories = run_graphql(
+            COMMIT_HISTORY_QUERY, {"login": username, "uid": user["id"], "cursor": cursor}, headers
+        )["user"]["repositories"]
+        for repo in repositories["nodes"]:
+            # Empty repos have no default branch
+            target = (repo.get("defaultBranchRef") or {}).get("target") or {}
+            total_commits += (target.get("history") or {}).get("totalCount", 0)
+
+        if not repositories["pageInfo"]["hasNextPage"]:
+            return total_commits
+        cursor = repositories["pageInfo"]["endCursor"]
+
+# Per-user generation numbers, part of the GitHub cache keys: bumping one user's number makes
+# their next lookup miss without dropping anyone else's cached entries
+@st.cache_resource
+def _score_generations():
+    return {}
+
+def bump_score_generation(username):
+    generations = _score_generations()
+    generations[username] = generations.get(username, 0) + 1
+
+# Failures raise, so they are never cached (or written to the database) as zeros
+@st.cache_data(ttl=1800, show_spinner=False)
+def _fetch_commit_changes_cached(username, generation):
     headers = {"Accept": "application/vnd.github.v3+json"}
-    github_token = os.getenv("GITHUB_TOKEN")
-    if github_token:
-        headers["Authorization"] = f"Bearer {github_token}"
     
+    # GraphQL needs a token; without one, fall back to the per-repo contributors listing
+    if GITHUB_TOKENS:
+        return fetch_commit_changes_gql(username, headers)
+
     total_commits = 0
-    try:
-        repos_url = f"https://api.github.com/users/{username}/repos"
-        repos_response = requests.get(repos_url, headers=headers)
-        repos_response.raise_for_status()
-        repositories = repos_response.json()
-
-        for repo in repositories:
-            owner = repo['owner']['login']
-            repo_name = repo['name']
-            contributors_url = f"https://api.github.com/repos/{owner}/{repo_name}/contributors"
-            contributors_response = requests.get(contributors_url, headers=headers)
-            contributors_response.raise_for_status()
-
-            contributors = contributors_response.json()
-            for contributor in contributors:
-                if contributor['login'] == username:
-                    total_commits += contributor['contributions']
-                    break
+    repos_url = f"https://api.github.com/users/{username}/repos"
+    for repo in github_paged(repos_url, headers):
+        owner = repo['owner']['login']
+        repo_name = repo['name']
+        contributors_url = f"https://api.github.com/repos/{owner}/{repo_name}/contributors"
+        contributors_response = github_get(contributors_url, headers)
+        contributors_response.raise_for_status()
+
+        contributors = _json(contributors_response)
+        for contributor in contributors:
+            if contributor['login'] == username:
+                total_commits += contributor['contributions']
+                break
+
+    return total_commits
 
-        return total_commits
-    except Exception as e:
-        st.error(f"Error fetching commit changes: {str(e)}")
-        return 0
+def fetch_commit_changes(username):
+    return _fetch_commit_changes_cached(username, _score_generations().get(username, 0))
+
+# All six score counters in one request: aliased searches plus the user's repo/star totals
+SCORES_GRAPHQL_QUERY = """
+query($login: String!, $prOpened: String!, $prMerged: String!, $issuesCreated: String!, $issuesClosed: String!) {
+  prOpened: search(query: $prOpened, type: ISSUE) { issueCount }
+  prMerged: search(query: $prMerged, type: ISSUE) { issueCount }
+  issuesCreated: search(query: $issuesCreated, type: ISSUE) { issueCount }
+  issuesClosed: search(query: $issuesClosed, type: ISSUE) { issueCount }
+  user(login: $login) {
+    repositories(ownerAffiliations: OWNER, privacy: PUBLIC) { totalCount }
+    starredRepositories { totalCount }
+  }
+}
+"""
+
+def fetch_scores_gql(username, headers):
+    data = run_graphql(SCORES_GRAPHQL_QUERY, {
+        "login": username,
+        "prOpened": f"type:pr author:{username}",
+        "prMerged": f"type:pr author:{username} is:merged",
+        "issuesCreated": f"type:issue author:{username}",
+        "issuesClosed": f"type:issue author:{username} is:closed",
+    }, headers)
+    user = data["user"] or {}
+    return {
+        "pull_requests_opened": data["prOpened"]["issueCount"],
+        "pull_requests_merged": data["prMerged"]["issueCount"],
+        "issues_created": data["issuesCreated"]["issueCount"],
+        "issues_closed": data["issuesClosed"]["issueCount"],
+        "repos_contributed_to": (user.get("repositories") or {}).get("totalCount", 0),
+        "starred_repositories": (user.get("starredRepositories") or {}).get("totalCount", 0),
+    }
 
-def fetch_github_scores(username):
-    github_token = os.getenv("GITHUB_TOKEN")
-    headers = {
-        "Accept": "application/vnd.github.v3+json",
-        "Authorization": f"Bearer {github_token}" if github_token else ""
+def _total_count(response):
+    return _json(response).get("total_count", 0)
+
+# Raises on any failed call; use fetch_github_scores_or_none where a page just needs to show an error
+@st.cache_data(ttl=1800, show_spinner=False)
+def _fetch_github_scores_cached(username, generation):
+    headers = {"Accept": "application/vnd.github.v3+json"}
+
+    search_url = "https://api.github.com/search/issues?q="
+    endpoints = {
+        "pull_requests_opened": lambda: _total_count(github_get(f"{search_url}type:pr+author:{username}", headers)),
+        "pull_requests_merged": lambda: _total_count(github_get(f"{search_url}type:pr+author:{username}+is:merged", headers)),
+        "issues_created": lambda: _total_count(github_get(f"{search_url}type:issue+author:{username}", headers)),
+        "issues_closed": lambda: _total_count(github_get(f"{search_url}type:issue+author:{username}+is:closed", headers)),
+        # Count every page, not just the first 30 items
+        "repos_contributed_to": lambda: sum(1 for _ in github_paged(f"https://api.github.com/users/{username}/repos", headers)),
+        "starred_repositories": lambda: sum(1 for _ in github_paged(f"https://api.github.com/users/{username}/starred", headers)),
     }
-    
+    ctx = get_script_run_ctx()
+
+    def _commit_changes():
+        # Worker threads need the script context for any st.error output
+        add_script_run_ctx(threading.current_thread(), ctx)
+        return fetch_commit_changes(username)
+
+    # All calls are independent, so run them side by side: latency is the slowest call, not the sum
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        commit_job = executor.submit(_commit_changes)
+
+        results = None
+        if GITHUB_TOKENS:
+            # GraphQL needs a token; one request instead of four rate-limited searches plus two lists
+            try:
+                results = fetch_scores_gql(username, headers)
+            except Exception:
+                results = None
+
+        if results is None:
+            jobs = {executor.submit(count): key for key, count in endpoints.items()}
+            results = {}
+            for future in as_completed(jobs):
+                results[jobs[future]] = future.result()
+        results["commit_changes"] = commit_job.result()
+
+    return {key: results[key] for key in (*endpoints, "commit_changes")}
+
+def fetch_github_scores(username):
     if username.startswith("https://github.com/"):
         username = username.split("https://github.com/")[-1].strip("/")
+    return _fetch_github_scores_cached(username, _score_generations().get(username, 0))
 
+def fetch_github_scores_or_none(username):
     try:
-        pr_opened = requests.get(
-            f"https://api.github.com/search/issues?q=type:pr+author:{username}",
-            headers=headers
-        ).json().get("total_count", 0)
-
-        pr_merged = requests.get(
-            f"https://api.github.com/search/issues?q=type:pr+author:{username}+is:merged",
-            headers=headers
-        ).json().get("total_count", 0)
-
-        issues_created = requests.get(
-            f"https://api.github.com/search/issues?q=type:issue+author:{username}",
-            headers=headers
-        ).json().get("total_count", 0)
-
-        issues_closed = requests.get(
-            f"https://api.github.com/search/issues?q=type:issue+author:{username}+is:closed",
-            headers=headers
-        ).json().get("total_count", 0)
-
-        repos_contributed_to = requests.get(
-            f"https://api.github.com/users/{username}/repos",
-            headers=headers
-        ).json()
-        repos_contributed_to_count = len(repos_contributed_to) if isinstance(repos_contributed_to, list) else 0
-
-        starred_repos = requests.get(
-            f"https://api.github.com/users/{username}/starred",
-            headers=headers
-        ).json()
-        starred_repos_count = len(starred_repos) if isinstance(starred_repos, list) else 0
-
-        commit_changes = fetch_commit_changes(username)
-
-        return {
-            "pull_requests_opened": pr_opened,
-            "pull_requests_merged": pr_merged,
-            "issues_created": issues_created,
-            "issues_closed": issues_closed,
-            "repos_contributed_to": repos_contributed_to_count,
-            "starred_repositories": starred_repos_count,
-            "commit_changes": commit_changes
-        }
+        return fetch_github_scores(username)
     except Exception as e:
         st.error(f"Error fetching scores: {str(e)}")
         return None
 
+SCORE_COLUMNS = """
+        username, pull_requests_opened, pull_requests_merged,
+        issues_created, issues_closed, repos_contributed_to,
+        starred_repositories, commit_changes, last_updated
+"""
+
+SCORES_ON_CONFLICT = """
+    ON CONFLICT (username) DO UPDATE SET
+        pull_requests_opened = EXCLUDED.pull_requests_opened,
+        pull_requests_merged = EXCLUDED.pull_requests_merged,
+        issues_created = EXCLUDED.issues_created,
+        issues_closed = EXCLUDED.issues_closed,
+        repos_contributed_to = EXCLUDED.repos_contributed_to,
+        starred_repositories = EXCLUDED.starred_repositories,
+        commit_changes = EXCLUDED.commit_changes,
+        last_updated = EXCLUDED.last_updated,
+        github_url = EXCLUDED.github_url
+"""
+
+# github_url is picked up from the user's account as part of every upsert
+UPSERT_SCORES_SQL = f"""
+    INSERT INTO scores ({SCORE_COLUMNS}, github_url)
+    SELECT v.*, g.github_url
+    FROM (VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)) AS v ({SCORE_COLUMNS})
+    LEFT JOIN github_accounts g USING (username)
+    {SCORES_ON_CONFLICT}
+"""
+
+# Staging table for bulk refreshes; rows arrive by binary COPY, then merge with one upsert
+CREATE_SCORES_STAGING_SQL = """
+    CREATE TEMP TABLE tmp_scores (
+        username VARCHAR(255) NOT NULL,
+        pull_requests_opened INT,
+        pull_requests_merged INT,
+        issues_created INT,
+        issues_closed INT,
+        repos_contributed_to INT,
+        starred_repositories INT,
+        commit_changes INT,
+        last_updated TIMESTAMP
+    ) ON COMMIT DROP
+"""
+
+SCORES_STAGING_TYPES = ["varchar"] + ["int4"] * 7 + ["timestamp"]
+
+MERGE_SCORES_STAGING_SQL = f"""
+    INSERT INTO scores ({SCORE_COLUMNS}, github_url)
+    SELECT t.*, g.github_url
+    FROM tmp_scores t
+    LEFT JOIN github_accounts g USING (username)
+    {SCORES_ON_CONFLICT}
+"""
+
+def _score_row(username, scores, updated_at):
+    return (
+        username,
+        scores["pull_requests_opened"],
+        scores["pull_requests_merged"],
+        scores["issues_created"],
+        scores["issues_closed"],
+        scores["repos_contributed_to"],
+        scores["starred_repositories"],
+        scores["commit_changes"],
+        updated_at
+    )
+
 def update_scores_in_db(username, scores):
     try:
-        conn = connect_to_db()
-        create_scores_table_if_not_exists(conn)
-        cursor = conn.cursor()
-
-        query = """
-            INSERT INTO scores (
-                username, pull_requests_opened, pull_requests_merged,
-                issues_created, issues_closed, repos_contributed_to,
-                starred_repositories, commit_changes, last_updated
-            )
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-            ON CONFLICT (username) DO UPDATE SET
-                pull_requests_opened = EXCLUDED.pull_requests_opened,
-                pull_requests_merged = EXCLUDED.pull_requests_merged,
-                issues_created = EXCLUDED.issues_created,
-                issues_closed = EXCLUDED.issues_closed,
-                repos_contributed_to = EXCLUDED.repos_contributed_to,
-                starred_repositories = EXCLUDED.starred_repositories,
-                commit_changes = EXCLUDED.commit_changes,
-                last_updated = EXCLUDED.last_updated;
-        """
-        cursor.execute(query, (
-            username,
-            scores["pull_requests_opened"],
-            scores["pull_requests_merged"],
-            scores["issues_created"],
-            scores["issues_closed"],
-            scores["repos_contributed_to"],
-            scores["starred_repositories"],
-            scores["commit_changes"],
-            datetime.now()
-        ))
-
-        conn.commit()
-        cursor.close()
-        conn.close()
+        with get_pool().connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(UPSERT_SCORES_SQL, _score_row(username, scores, datetime.now()))
+
         return True, "Scores updated successfully!"
     except Exception as e:
         return False, f"Database error: {str(e)}"
 
-def fetch_leaderboard():
+# Upsert many users' scores in one transaction: one COPY into a staging table, one merge
+def update_scores_bulk(scores_by_user):
+    if not scores_by_user:
+        return True, "No scores to update."
     try:
-        conn = connect_to_db()
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT s.username, (
-                COALESCE(s.pull_requests_opened, 0) +
-                COALESCE(s.pull_requests_merged, 0) +
-                COALESCE(s.issues_created, 0) +
-                COALESCE(s.issues_closed, 0) +
-                COALESCE(s.repos_contributed_to, 0) +
-                COALESCE(s.starred_repositories, 0) +
-                COALESCE(s.commit_changes, 0)
-            ) AS total_score, g.github_url
-            FROM scores s
-            LEFT JOIN github_accounts g ON s.username = g.username
-            ORDER BY total_score DESC;
+        now = datetime.now()
+        with get_pool().connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(CREATE_SCORES_STAGING_SQL)
+                with cursor.copy("COPY tmp_scores FROM STDIN WITH (FORMAT BINARY)") as copy:
+                    copy.set_types(SCORES_STAGING_TYPES)
+                    for username, scores in scores_by_user.items():
+                        copy.write_row(_score_row(username, scores, now))
+                cursor.execute(MERGE_SCORES_STAGING_SQL)
+
+        return True, f"Updated scores for {len(scores_by_user)} users."
+    except Exception as e:
+        return False, f"Database error: {str(e)}"
+
+# Run fn(*args) on a worker thread with the caller's script context attached
+def _in_script_ctx(ctx, fn, *args):
+    add_script_run_ctx(threading.current_thread(), ctx)
+    return fn(*args)
+
+# Profile card data through the shared session, token pool and ETag store. None for unknown users;
+# other failures raise so they aren't cached
+@st.cache_data(ttl=3600, show_spinner=False)
+def fetch_github_profile_data(username):
+    response = github_get(f"https://api.github.com/users/{username}", {"Accept": "application/vnd.github.v3+json"})
+    if response.status_code == 404:
+        return None
+    response.raise_for_status()
+    return parse_github_profile(_json(response), username)
+
+def fetch_github_profile_or_none(username):
+    try:
+        return fetch_github_profile_data(username)
+    except Exception as e:
+        st.error(f"Error fetching profile: {str(e)}")
+        return None
+
+# Fetch several users' scores side by side; users whose fetch failed are left out
+def fetch_scores_for_users(usernames, max_workers=5):
+    ctx = get_script_run_ctx()
+
+    def _fetch(username):
+        add_script_run_ctx(threading.current_thread(), ctx)
+        return fetch_github_scores_or_none(username)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = dict(zip(usernames, executor.map(_fetch, usernames)))
+    return {username: scores for username, scores in results.items() if scores}
+
+# Create both tables (and the generated score column) once per process instead of on every write
+@st.cache_resource
+def _init_schema():
+    with get_pool().connection() as conn:
+        create_accounts_table_if_not_exists(conn)
+        create_scores_table_if_not_exists(conn)
+        # Backfill the denormalized github_url for rows written before the column existed
+        conn.execute("""
+            UPDATE scores s SET github_url = g.github_url
+            FROM github_accounts g
+            WHERE s.username = g.username AND s.github_url IS NULL;
         """)
-        rows = cursor.fetchall()
-        cursor.close()
-        conn.close()
-        return rows
+        # Refresh planner statistics once per process so the new index is costed correctly
+        conn.execute("ANALYZE scores;")
+    return True
+
+LEADERBOARD_SQL = """
+    SELECT username, contribution_total AS total_score,
+           COALESCE(github_url, 'https://github.com/' || username)
+    FROM scores
+    ORDER BY contribution_total DESC
+    LIMIT %s
+"""
+
+# The Dashboard shows the top 10 as a list and a chart; totals come from fetch_leaderboard_stats
+LEADERBOARD_LIMIT = 10
+
+LEADERBOARD_STATS_SQL = """
+    SELECT COUNT(*), COALESCE(SUM(contribution_total), 0),
+           COALESCE(AVG(contribution_total), 0), COALESCE(MAX(contribution_total), 0)
+    FROM scores
+"""
+
+# Rankings move slowly; serve reruns from cache and re-query at most once a minute
+@st.cache_data(ttl=60, show_spinner=False)
+def fetch_leaderboard(limit=LEADERBOARD_LIMIT):
+    try:
+        with get_pool().connection() as conn, conn.cursor() as cursor:
+            # Prepare on first use so pooled connections reuse the cached plan
+            cursor.execute(LEADERBOARD_SQL, (limit,), prepare=True)
+            return cursor.fetchall()
     except Exception as e:
         st.error(f"Error fetching leaderboard: {str(e)}")
         return []
 
+# (total_users, total_score, avg_score, top_score) aggregated by Postgres instead of over fetched rows
+@st.cache_data(ttl=60, show_spinner=False)
+def fetch_leaderboard_stats():
+    try:
+        with get_pool().connection() as conn, conn.cursor() as cursor:
+            cursor.execute(LEADERBOARD_STATS_SQL, prepare=True)
+            return cursor.fetchone()
+    except Exception as e:
+        st.error(f"Error fetching leaderboard statistics: {str(e)}")
+        return 0, 0, 0, 0
+
+password_hasher = PasswordHasher(time_cost=2, memory_cost=65536, parallelism=2)
+
+# Returns (valid, upgraded_hash); upgraded_hash is set when the stored hash should be replaced
+def verify_password(password_hash, password):
+    if not password_hash.startswith("$argon2"):
+        # Legacy werkzeug pbkdf2 hash: verify once, then migrate to argon2
+        if check_password_hash(password_hash, password):
+            return True, password_hasher.hash(password)
+        return False, None
+
+    try:
+        password_hasher.verify(password_hash, password)
+    except (VerificationError, InvalidHashError):
+        return False, None
+
+    if password_hasher.check_needs_rehash(password_hash):
+        return True, password_hasher.hash(password)
+    return True, None
+
 def validate_login(username, password):
     try:
-        conn = connect_to_db()
-        cursor = conn.cursor()
-        cursor.execute("SELECT password_hash FROM github_accounts WHERE username = %s", (username,))
-        record = cursor.fetchone()
-        cursor.close()
-        conn.close()
-
-        if record and check_password_hash(record[0], password):
-            return True, "Login successful!"
+        with get_pool().connection() as conn, conn.cursor() as cursor:
+            cursor.execute("SELECT password_hash FROM github_accounts WHERE username = %s", (username,))
+            record = cursor.fetchone()
+
+            if record:
+                valid, upgraded_hash = verify_password(record[0], password)
+                if valid:
+                    if upgraded_hash:
+                        cursor.execute(
+                            "UPDATE github_accounts SET password_hash = %s WHERE username = %s",
+                            (upgraded_hash, username)
+                        )
+                    return True, "Login successful!"
         return False, "Invalid username or password."
     except Exception as e:
         return False, f"Database error: {str(e)}"
@@ -254,32 +593,83 @@ def validate_login(username, password):
 def sign_up(github_url, password):
     try:
         username = github_url.split("https://github.com/")[-1].strip("/")
-        response = requests.get(f"https://api.github.com/users/{username}")
+        response = github_request("GET", f"https://api.github.com/users/{username}", {})
         if response.status_code != 200:
             return False, "GitHub account does not exist."
 
-        conn = connect_to_db()
-        create_accounts_table_if_not_exists(conn)
-        cursor = conn.cursor()
-
-        cursor.execute("SELECT * FROM github_accounts WHERE username = %s", (username,))
-        if cursor.fetchone():
-            return False, "User already exists. Please log in."
-
-        password_hash = generate_password_hash(password)
-        query = """
-            INSERT INTO github_accounts (username, password_hash, github_url)
-            VALUES (%s, %s, %s)
-        """
-        cursor.execute(query, (username, password_hash, github_url))
-        conn.commit()
-        cursor.close()
-        conn.close()
+        with get_pool().connection() as conn:
+            cursor = conn.cursor()
+
+            cursor.execute("SELECT * FROM github_accounts WHERE username = %s", (username,))
+            if cursor.fetchone():
+                return False, "User already exists. Please log in."
+
+            password_hash = password_hasher.hash(password)
+            query = """
+                INSERT INTO github_accounts (username, password_hash, github_url)
+                VALUES (%s, %s, %s)
+            """
+            cursor.execute(query, (username, password_hash, github_url))
 
         return True, "User signed up successfully!"
     except Exception as e:
         return False, f"Error during sign-up: {str(e)}"
 
+# Well past the 30-minute score cache, so each run is a deliberate full crawl rather than a constant one
+SCORE_REFRESH_MINUTES = 360
+REFRESH_BATCH_SIZE = 5  # users fetched side by side between budget checks
+REFRESH_RATE_LIMIT_RESERVE = 200  # requests left for interactive use when the crawl stops early
+
+# Scores for one user from the scheduler thread; there is no script context there, so errors are printed
+def _fetch_scores_logged(username):
+    try:
+        return fetch_github_scores(username)
+    except Exception as e:
+        print(f"Error fetching scores for {username}: {e}")
+        return None
+
+# Crawl GitHub for every registered user; runs on the scheduler thread, never during a page render.
+# Stops early once the rate limit nears the reserve; the remaining users wait for the next run
+def refresh_all_users():
+    try:
+        with get_pool().connection() as conn, conn.cursor() as cursor:
+            cursor.execute("SELECT username FROM github_accounts;")
+            usernames = [row[0] for row in cursor.fetchall()]
+
+        scores_by_user = {}
+        with ThreadPoolExecutor(max_workers=REFRESH_BATCH_SIZE) as executor:
+            for start in range(0, len(usernames), REFRESH_BATCH_SIZE):
+                budget = github_budget()
+                if budget is not None and budget < REFRESH_RATE_LIMIT_RESERVE:
+                    print(f"[{datetime.now()}] Score refresh paused after {start} users: {budget} GitHub requests left")
+                    break
+                batch = usernames[start:start + REFRESH_BATCH_SIZE]
+                for username, scores in zip(batch, executor.map(_fetch_scores_logged, batch)):
+                    if scores:
+                        scores_by_user[username] = scores
+
+        success, msg = update_scores_bulk(scores_by_user)
+        if success:
+            fetch_leaderboard.clear()
+            fetch_leaderboard_stats.clear()
+        print(f"[{datetime.now()}] Score refresh for {len(usernames)} users: {msg}")
+    except Exception as e:
+        print(f"Error refreshing scores: {e}")
+
+# One scheduler per process, however many sessions are open; the first crawl waits a full interval
+# so booting a process doesn't immediately spend the rate limit on every registered user
+@st.cache_resource
+def start_score_refresher():
+    return start_background_scheduler(refresh_all_users, SCORE_REFRESH_MINUTES)
+
+# A failed attempt isn't cached, so the schema setup is retried on the next rerun
+try:
+    _init_schema()
+except Exception as e:
+    st.error(f"Database error: {str(e)}")
+
+start_score_refresher()
+
 # Initialize session state
 if "page" not in st.session_state:
     st.session_state.page = "Login"
@@ -300,11 +690,14 @@ with st.sidebar:
             st.session_state.page = "Profile"
         
         if st.button("🔄 Refresh Scores", use_container_width=True):
-            # Refresh current user's scores
-            scores = fetch_github_scores(st.session_state.current_user)
+            # Refresh current user's scores, bypassing only their cached GitHub lookups
+            bump_score_generation(st.session_state.current_user)
+            scores = fetch_github_scores_or_none(st.session_state.current_user)
             if scores:
                 success, msg = update_scores_in_db(st.session_state.current_user, scores)
                 if success:
+                    fetch_leaderboard.clear()
+                    fetch_leaderboard_stats.clear()
                     st.success("Scores updated!")
                 else:
                     st.error(msg)
@@ -367,26 +760,7 @@ if st.session_state.page == "Login":
 elif st.session_state.page == "Dashboard":
     st.markdown(create_header("🏆 GitHub Leaderboard", "Community Rankings & Statistics"), unsafe_allow_html=True)
     
-    # Fetch and update all users' scores
-    with st.spinner("Updating leaderboard data..."):
-        try:
-            conn = connect_to_db()
-            cursor = conn.cursor()
-            cursor.execute("SELECT username FROM github_accounts;")
-            all_users = cursor.fetchall()
-            cursor.close()
-            conn.close()
-            
-            # Update scores for all users (you might want to do this less frequently in production)
-            for user in all_users[:5]:  # Limit to first 5 users to avoid API rate limits
-                username = user[0]
-                scores = fetch_github_scores(username)
-                if scores:
-                    update_scores_in_db(username, scores)
-        except Exception as e:
-            st.error(f"Error updating scores: {str(e)}")
-
-    # Fetch leaderboard data
+    # Fetch leaderboard data (scores are refreshed in the background by start_score_refresher)
     leaderboard = fetch_leaderboard()
     
     # Main dashboard layout
@@ -396,9 +770,12 @@ elif st.session_state.page == "Dashboard":
         st.subheader("🏆 Top Contributors")
         
         if leaderboard:
-            # Display top 10 in a styled format
-            for i, (username, score, github_url) in enumerate(leaderboard[:10], 1):
-                st.markdown(create_leaderboard_item(i, username, score, github_url), unsafe_allow_html=True)
+            # Display top 10 in a styled format, as one markdown element instead of one delta per row
+            items = [
+                create_leaderboard_item(i, username, score, github_url).strip()
+                for i, (username, score, github_url) in enumerate(leaderboard[:10], 1)
+            ]
+            st.markdown("\n".join(items), unsafe_allow_html=True)
             
             # Create leaderboard chart
             if len(leaderboard) > 1:
@@ -411,12 +788,8 @@ elif st.session_state.page == "Dashboard":
     with col2:
         st.subheader("📊 Statistics")
         
-        if leaderboard:
-            total_users = len(leaderboard)
-            total_score = sum([user[1] for user in leaderboard])
-            avg_score = total_score / total_users if total_users > 0 else 0
-            top_score = leaderboard[0][1] if leaderboard else 0
-            
+        total_users, total_score, avg_score, top_score = fetch_leaderboard_stats()
+        if total_users:
             stats = [
                 {"value": total_users, "label": "Total Users"},
                 {"value": f"{total_score:,}", "label": "Total Score"},
@@ -438,8 +811,12 @@ elif st.session_state.page == "Profile":
         
         # Fetch user data
         with st.spinner("Loading profile data..."):
-            scores = fetch_github_scores(username)
-            profile_data = fetch_github_profile_data(username)
+            # Scores and profile are independent lookups, so overlap them
+            ctx = get_script_run_ctx()
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                scores_job = executor.submit(_in_script_ctx, ctx, fetch_github_scores_or_none, username)
+                profile_job = executor.submit(_in_script_ctx, ctx, fetch_github_profile_or_none, username)
+                scores, profile_data = scores_job.result(), profile_job.result()
         
         if scores and profile_data:
             col1, col2 = st.columns([1, 2])
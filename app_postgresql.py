@@ -1,6 +1,12 @@
 import streamlit as st
 import requests
-import psycopg
+from requests.adapters import HTTPAdapter
+from cachetools import TTLCache
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+from psycopg.conninfo import make_conninfo
+from psycopg_pool import ConnectionPool
 import os
 from datetime import datetime
 from dotenv import load_dotenv
@@ -14,15 +20,17 @@ DB_HOST = os.getenv("DB_HOST")
 DB_PORT = os.getenv("DB_PORT")
 
 
-# Function to connect to the database using existing credentials
-def connect_to_db():
-    return psycopg.connect(
+# One connection pool per process; pool.connection() checks a connection out and commits on exit
+@st.cache_resource
+def get_db_pool():
+    conninfo = make_conninfo(
         dbname=DB_NAME,
         user=DB_USER,
         password=DB_PASSWORD,
         host=DB_HOST,
         port=DB_PORT,
     )
+    return ConnectionPool(conninfo=conninfo, min_size=1, max_size=16, open=True)
 
 def create_accounts_table_if_not_exists(conn):
     cursor = conn.cursor()
@@ -54,13 +62,75 @@ def create_scores_table_if_not_exists(conn):
     );
     """
     cursor.execute(create_table_query)
+    # Leaderboard score kept up to date by Postgres so ranking is an index scan, not a sort.
+    # Same column and formula as app_modern; app_mini_pro's total_score is a different, weighted score
+    cursor.execute("""
+        ALTER TABLE scores ADD COLUMN IF NOT EXISTS contribution_total INT GENERATED ALWAYS AS (
+            COALESCE(pull_requests_opened, 0) +
+            COALESCE(pull_requests_merged, 0) +
+            COALESCE(issues_created, 0) +
+            COALESCE(issues_closed, 0) +
+            COALESCE(repos_contributed_to, 0) +
+            COALESCE(starred_repositories, 0) +
+            COALESCE(commit_changes, 0)
+        ) STORED;
+    """)
+    # app_modern's covering leaderboard index, created under the same name and definition so a shared
+    # database ends up with one index on contribution_total, not two. It covers app_modern's github_url copy
+    cursor.execute("ALTER TABLE scores ADD COLUMN IF NOT EXISTS github_url TEXT;")
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_scores_leaderboard
+        ON scores (contribution_total DESC) INCLUDE (username, github_url);
+    """)
     conn.commit()
 
+# One keep-alive session shared by every GitHub call, sized for the fetch pool below
+@st.cache_resource
+def get_github_session():
+    session = requests.Session()
+    session.mount("https://", HTTPAdapter(pool_connections=32, pool_maxsize=32))
+    return session
+
+# Successful GitHub responses, keyed by URL and auth scope: served as-is for 10 minutes, and kept
+# for a day as the ETag source so revalidation answers 304 (which doesn't count against the rate limit)
+@st.cache_resource
+def get_github_cache():
+    return TTLCache(maxsize=10_000, ttl=600), TTLCache(maxsize=10_000, ttl=24 * 3600), threading.Lock()
+
+def _github_get(url, headers=None):
+    headers = headers or {}
+    fresh, validators, lock = get_github_cache()
+    key = (url, headers.get("Authorization"))
+    with lock:
+        cached = fresh.get(key) or validators.get(key)
+    if cached is not None and key in fresh:
+        return cached
+
+    conditional = {**headers, "If-None-Match": cached.headers["ETag"]} if cached is not None else headers
+    response = get_github_session().get(url, headers=conditional)
+    if response.status_code == 304 and cached is not None:
+        response = cached
+    if response.status_code == 200:
+        with lock:
+            fresh[key] = response
+            if response.headers.get("ETag"):
+                validators[key] = response
+    return response
+
+# Create both tables and their indexes once per process, not on every write
+@st.cache_resource
+def init_schema():
+    with get_db_pool().connection() as conn:
+        create_accounts_table_if_not_exists(conn)
+        create_scores_table_if_not_exists(conn)
+    return True
+
 # Function to validate GitHub account existence
+@st.cache_data(ttl=600, show_spinner=False)
 def validate_github_account(github_url):
     try:
         username = github_url.split("https://github.com/")[-1].strip("/")
-        response = requests.get(f"https://api.github.com/users/{username}")
+        response = _github_get(f"https://api.github.com/users/{username}")
         if response.status_code == 200:
             return True, "GitHub account exists."
         else:
@@ -71,183 +141,209 @@ def validate_github_account(github_url):
 # Function to fetch commit changes using GitHub API
 def fetch_commit_changes(username):
     headers = {"Accept": "application/vnd.github.v3+json"}
-    total_commits = 0
+
+    # The user's commit count in one repository, or 0 if they aren't among its contributors
+    def _get_contrib_count(repo):
+        owner = repo['owner']['login']
+        repo_name = repo['name']
+        # 100 per page: the default 30 misses anyone outside a busy repo's top contributors
+        contributors_url = f"https://api.github.com/repos/{owner}/{repo_name}/contributors?per_page=100"
+        contributors_response = _github_get(contributors_url, headers)
+        contributors_response.raise_for_status()
+        if contributors_response.status_code == 204:  # Empty repository
+            return 0
+
+        for contributor in contributors_response.json():
+            if contributor['login'] == username:
+                return contributor['contributions']
+        return 0
 
     try:
         # Step 1: Get user's repositories
         repos_url = f"https://api.github.com/users/{username}/repos"
-        repos_response = requests.get(repos_url, headers=headers)
+        repos_response = _github_get(repos_url, headers)
         repos_response.raise_for_status()
         repositories = repos_response.json()
 
-        # Step 2: Loop through each repository and fetch commit count
-        for repo in repositories:
-            owner = repo['owner']['login']
-            repo_name = repo['name']
-            contributors_url = f"https://api.github.com/repos/{owner}/{repo_name}/contributors"
-            contributors_response = requests.get(contributors_url, headers=headers)
-            contributors_response.raise_for_status()
-
-            # Find the user's contribution in this repository
-            contributors = contributors_response.json()
-            for contributor in contributors:
-                if contributor['login'] == username:
-                    total_commits += contributor['contributions']
-                    break
-
-        return total_commits
+        # Step 2: Fetch every repository's contributors side by side and add up the user's commits
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            return sum(executor.map(_get_contrib_count, repositories))
     except Exception as e:
         st.error(f"Error fetching commit changes: {str(e)}")
         return 0
 
-# Function to fetch scores using GitHub API
-def fetch_github_scores(username):
-    
-    github_token = os.getenv("GITHUB_TOKEN")
-    
-    headers={
-        "Accept": "application/vnd.github.v3+json",
-        "Authorization": f"Bearer {github_token}"
-    }
-    
+def _github_username(username):
     if username.startswith("https://github.com/"):
         username = username.split("https://github.com/")[-1].strip("/")
+    return username
 
+# One independent request per score field; each callable returns that field's value
+def _score_requests(username):
+    github_token = os.getenv("GITHUB_TOKEN")
+    
+    headers = {"Accept": "application/vnd.github.v3+json"}
+    if github_token:
+        headers["Authorization"] = f"Bearer {github_token}"
+    
+    search_url = "https://api.github.com/search/issues?q="
+
+    def _total_count(query):
+        return _github_get(f"{search_url}{query}", headers).json().get("total_count", 0)
+
+    def _list_length(url):
+        items = _github_get(url, headers).json()
+        return len(items) if isinstance(items, list) else 0
+
+    return {
+        "pull_requests_opened": lambda: _total_count(f"type:pr+author:{username}"),
+        "pull_requests_merged": lambda: _total_count(f"type:pr+author:{username}+is:merged"),
+        "issues_created": lambda: _total_count(f"type:issue+author:{username}"),
+        "issues_closed": lambda: _total_count(f"type:issue+author:{username}+is:closed"),
+        "repos_contributed_to": lambda: _list_length(f"https://api.github.com/users/{username}/repos"),
+        "starred_repositories": lambda: _list_length(f"https://api.github.com/users/{username}/starred"),
+        "commit_changes": lambda: fetch_commit_changes(username),
+    }
 
-    try:
-        # Pull Requests Opened
-        pr_opened = requests.get(
-            f"https://api.github.com/search/issues?q=type:pr+author:{username}",
-            headers=headers
-        ).json().get("total_count", 0)
-
-        # Pull Requests Merged
-        pr_merged = requests.get(
-            f"https://api.github.com/search/issues?q=type:pr+author:{username}+is:merged",
-            headers=headers
-        ).json().get("total_count", 0)
-
-        # Issues Created
-        issues_created = requests.get(
-            f"https://api.github.com/search/issues?q=type:issue+author:{username}",
-            headers=headers
-        ).json().get("total_count", 0)
-
-        # Issues Closed
-        issues_closed = requests.get(
-            f"https://api.github.com/search/issues?q=type:issue+author:{username}+is:closed",
-            headers=headers
-        ).json().get("total_count", 0)
-
-        # Repositories Contributed To
-        repos_contributed_to = requests.get(
-            f"https://api.github.com/users/{username}/repos",
-            headers=headers
-        ).json()
-        repos_contributed_to_count = len(repos_contributed_to) if isinstance(repos_contributed_to, list) else 0
-
-        # Starred Repositories
-        starred_repos = requests.get(
-            f"https://api.github.com/users/{username}/starred",
-            headers=headers
-        ).json()
-        starred_repos_count = len(starred_repos) if isinstance(starred_repos, list) else 0
-
-        # Commit Changes
-        commit_changes = fetch_commit_changes(username)
-
-        return {
-            "pull_requests_opened": pr_opened,
-            "pull_requests_merged": pr_merged,
-            "issues_created": issues_created,
-            "issues_closed": issues_closed,
-            "repos_contributed_to": repos_contributed_to_count,
-            "starred_repositories": starred_repos_count,
-            "commit_changes": commit_changes
+# Run fn() on a worker thread with the caller's script context attached, so st.error still works
+def _in_script_ctx(ctx, fn):
+    add_script_run_ctx(threading.current_thread(), ctx)
+    return fn()
+
+# Fetch scores for many users at once: every request of every user goes into one thread pool,
+# so wall time is roughly the slowest request rather than users x endpoints round trips
+def fetch_scores_for_users(usernames, max_workers=32):
+    usernames = [_github_username(username) for username in usernames]
+    ctx = get_script_run_ctx()
+    results = {username: {} for username in usernames}
+    failed = set()
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        jobs = {
+            executor.submit(_in_script_ctx, ctx, request): (username, key)
+            for username in usernames
+            for key, request in _score_requests(username).items()
         }
-    except Exception as e:
-        st.error(f"Error fetching scores: {str(e)}")
-        return None
+        for future in as_completed(jobs):
+            username, key = jobs[future]
+            try:
+                results[username][key] = future.result()
+            except Exception as e:
+                if username not in failed:
+                    st.error(f"Error fetching scores for {username}: {str(e)}")
+                failed.add(username)
+
+    return {username: scores for username, scores in results.items() if username not in failed}
+
+# Function to fetch scores using GitHub API
+def fetch_github_scores(username):
+    return fetch_scores_for_users([username]).get(_github_username(username))
+
+# Rows whose counters haven't changed are left alone, so rowcount is the number of real changes
+UPSERT_SCORES_SQL = """
+    INSERT INTO scores (
+        username, pull_requests_opened, pull_requests_merged,
+        issues_created, issues_closed, repos_contributed_to,
+        starred_repositories, commit_changes, last_updated
+    )
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+    ON CONFLICT (username) DO UPDATE SET
+        pull_requests_opened = EXCLUDED.pull_requests_opened,
+        pull_requests_merged = EXCLUDED.pull_requests_merged,
+        issues_created = EXCLUDED.issues_created,
+        issues_closed = EXCLUDED.issues_closed,
+        repos_contributed_to = EXCLUDED.repos_contributed_to,
+        starred_repositories = EXCLUDED.starred_repositories,
+        commit_changes = EXCLUDED.commit_changes,
+        last_updated = EXCLUDED.last_updated
+    WHERE (
+        scores.pull_requests_opened, scores.pull_requests_merged,
+        scores.issues_created, scores.issues_closed, scores.repos_contributed_to,
+        scores.starred_repositories, scores.commit_changes
+    ) IS DISTINCT FROM (
+        EXCLUDED.pull_requests_opened, EXCLUDED.pull_requests_merged,
+        EXCLUDED.issues_created, EXCLUDED.issues_closed, EXCLUDED.repos_contributed_to,
+        EXCLUDED.starred_repositories, EXCLUDED.commit_changes
+    );
+"""
+
+def _score_row(username, scores, updated_at):
+    return (
+        username,
+        scores["pull_requests_opened"],
+        scores["pull_requests_merged"],
+        scores["issues_created"],
+        scores["issues_closed"],
+        scores["repos_contributed_to"],
+        scores["starred_repositories"],
+        scores["commit_changes"],
+        updated_at
+    )
 
 # Function to insert or update scores in the database
 def update_scores_in_db(username, scores):
     try:
-        conn = connect_to_db()
-        create_scores_table_if_not_exists(conn)  # Ensure the 'scores' table exists
-        cursor = conn.cursor()
-
-        query = """
-            INSERT INTO scores (
-                username, pull_requests_opened, pull_requests_merged,
-                issues_created, issues_closed, repos_contributed_to,
-                starred_repositories, commit_changes, last_updated
-            )
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-            ON CONFLICT (username) DO UPDATE SET
-                pull_requests_opened = EXCLUDED.pull_requests_opened,
-                pull_requests_merged = EXCLUDED.pull_requests_merged,
-                issues_created = EXCLUDED.issues_created,
-                issues_closed = EXCLUDED.issues_closed,
-                repos_contributed_to = EXCLUDED.repos_contributed_to,
-                starred_repositories = EXCLUDED.starred_repositories,
-                commit_changes = EXCLUDED.commit_changes,
-                last_updated = EXCLUDED.last_updated;
-        """
-        cursor.execute(query, (
-            username,
-            scores["pull_requests_opened"],
-            scores["pull_requests_merged"],
-            scores["issues_created"],
-            scores["issues_closed"],
-            scores["repos_contributed_to"],
-            scores["starred_repositories"],
-            scores["commit_changes"],
-            datetime.now()
-        ))
-
-        conn.commit()
-        cursor.close()
-        conn.close()
+        with get_db_pool().connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(UPSERT_SCORES_SQL, _score_row(username, scores, datetime.now()))
+            changed = cursor.rowcount
 
+        if changed:
+            fetch_leaderboard.clear()
         return True, "Scores updated successfully in the 'scores' table."
     except Exception as e:
         return False, f"Database error: {str(e)}"
 
-# Function to fetch all usernames and scores
-def fetch_leaderboard():
+# Upsert many users' scores over one pooled connection in one transaction; psycopg pipelines
+# executemany, so the whole batch costs about one round trip instead of one per user
+def update_scores_batch(scores_by_user):
+    if not scores_by_user:
+        return True, "No scores to update."
     try:
-        conn = connect_to_db()
+        now = datetime.now()
+        with get_db_pool().connection() as conn:
+            cursor = conn.cursor()
+            cursor.executemany(
+                UPSERT_SCORES_SQL,
+                [_score_row(username, scores, now) for username, scores in scores_by_user.items()]
+            )
+            changed = cursor.rowcount  # Summed over the whole batch
+
+        # Most renders re-write identical scores; only a real change should cost the cached leaderboard
+        if changed:
+            fetch_leaderboard.clear()
+        return True, f"Updated scores for {changed} of {len(scores_by_user)} users."
+    except Exception as e:
+        return False, f"Database error: {str(e)}"
+
+LEADERBOARD_LIMIT = 100
+
+# Function to fetch the top usernames and scores; plain tuples so the cached copy is cheap to clone.
+# Errors propagate (and so aren't cached) for the caller to report
+@st.cache_data(ttl=60, show_spinner=False)
+def fetch_leaderboard(limit=LEADERBOARD_LIMIT):
+    with get_db_pool().connection() as conn:
         cursor = conn.cursor()
         cursor.execute("""
-            SELECT username, (
-                COALESCE(pull_requests_opened, 0) +
-                COALESCE(pull_requests_merged, 0) +
-                COALESCE(issues_created, 0) +
-                COALESCE(issues_closed, 0) +
-                COALESCE(repos_contributed_to, 0) +
-                COALESCE(starred_repositories, 0) +
-                COALESCE(commit_changes, 0)
-            ) AS total_score
-            FROM scores
-            ORDER BY total_score DESC;
-        """)
-        rows = cursor.fetchall()
-        cursor.close()
-        conn.close()
-        return rows
-    except Exception as e:
-        st.error(f"Error fetching leaderboard: {str(e)}")
-        return []
+            SELECT username, contribution_total FROM scores
+            ORDER BY contribution_total DESC
+            LIMIT %s;
+        """, (limit,))
+        return [tuple(row) for row in cursor.fetchall()]
+
+@st.cache_data(ttl=60, show_spinner=False)
+def list_usernames():
+    with get_db_pool().connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT username FROM github_accounts;")
+        return [row[0] for row in cursor.fetchall()]
 
 
 def validate_login(username, password):
     try:
-        conn = connect_to_db()
-        cursor = conn.cursor()
-        cursor.execute("SELECT password_hash FROM github_accounts WHERE username = %s", (username,))
-        record = cursor.fetchone()
-        cursor.close()
-        conn.close()
+        with get_db_pool().connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT password_hash FROM github_accounts WHERE username = %s", (username,))
+            record = cursor.fetchone()
 
         if record and check_password_hash(record[0], password):
             return True, "Login successful!"
@@ -259,33 +355,36 @@ def sign_up(github_url, password):
     try:
         # Validate GitHub account
         username = github_url.split("https://github.com/")[-1].strip("/")
-        response = requests.get(f"https://api.github.com/users/{username}")
+        response = _github_get(f"https://api.github.com/users/{username}")
         if response.status_code != 200:
             return False, "GitHub account does not exist."
 
-        conn = connect_to_db()
-        cursor = conn.cursor()
+        with get_db_pool().connection() as conn:
+            cursor = conn.cursor()
+
+            # Check if the GitHub URL already exists
+            cursor.execute("SELECT * FROM github_accounts WHERE username = %s", (username,))
+            if cursor.fetchone():
+                return False, "User already exists. Please log in."
 
-        # Check if the GitHub URL already exists
-        cursor.execute("SELECT * FROM github_accounts WHERE username = %s", (username,))
-        if cursor.fetchone():
-            return False, "User already exists. Please log in."
-
-        # Insert new user into the github_accounts table
-        password_hash = generate_password_hash(password)
-        query = """
-            INSERT INTO github_accounts (username, password_hash, github_url)
-            VALUES (%s, %s, %s)
-        """
-        cursor.execute(query, (username, password_hash, github_url))
-        conn.commit()
-        cursor.close()
-        conn.close()
+            # Insert new user into the github_accounts table
+            password_hash = generate_password_hash(password)
+            query = """
+                INSERT INTO github_accounts (username, password_hash, github_url)
+                VALUES (%s, %s, %s)
+            """
+            cursor.execute(query, (username, password_hash, github_url))
 
+        list_usernames.clear()
         return True, "User signed up successfully!"
     except Exception as e:
         return False, f"Error during sign-up: {str(e)}"
 
+try:
+    init_schema()
+except Exception as e:
+    st.error(f"Database error: {str(e)}")
+
 # Streamlit App layout
 if "page" not in st.session_state:
     st.session_state.page = "Login"
@@ -335,25 +434,22 @@ elif st.session_state.page == "Dashboard":
 
     # Fetch all users from github_accounts
     try:
-        conn = connect_to_db()
-        cursor = conn.cursor()
-        cursor.execute("SELECT username FROM github_accounts;")
-        all_users = cursor.fetchall()
-        cursor.close()
-        conn.close()
+        all_users = list_usernames()
     except Exception as e:
         st.error(f"Error fetching users: {str(e)}")
         all_users = []
 
-    # Update scores for all users
-    for user in all_users:
-        username = user[0]
-        scores = fetch_github_scores(username)
-        if scores:
-            update_scores_in_db(username, scores)
+    # Update scores for all users; the GitHub calls for everyone run concurrently, then one batched upsert
+    db_status, db_message = update_scores_batch(fetch_scores_for_users(all_users))
+    if not db_status:
+        st.error(db_message)
 
     # Fetch leaderboard data
-    leaderboard = fetch_leaderboard()
+    try:
+        leaderboard = fetch_leaderboard()
+    except Exception as e:
+        st.error(f"Error fetching leaderboard: {str(e)}")
+        leaderboard = []
 
     # Display leaderboard
     st.subheader("Leaderboard")
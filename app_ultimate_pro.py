@@ -4,15 +4,17 @@ Next-generation developer community platform with enterprise-grade features
 """
 import streamlit as st
 import psycopg2
-import requests
+from psycopg2.extras import execute_values
+from psycopg2.pool import ThreadedConnectionPool
+from contextlib import contextmanager
+import httpx
 import pandas as pd
-from datetime import datetime, timedelta
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
+import numpy as np
+from datetime import datetime
+import re
 import time
-import hashlib
-import json
+import threading
+import orjson
 import asyncio
 from typing import Dict, List, Optional
 
@@ -90,6 +92,8 @@ except ImportError as e:
     def security_middleware(): pass
     def create_security_dashboard(): st.info("🔒 Security dashboard coming soon!")
 
+from utils.scoring import days_since, repo_features, score_features, warm_up_score_kernel
+
 # Configuration
 st.set_page_config(
     page_title="GitHub Leaderboard Pro",
@@ -111,317 +115,740 @@ def initialize_components():
 
 components = initialize_components()
 
+@st.cache_resource
+def warm_up_scoring():
+    """Compile the scoring kernel once per process so the first login doesn't pay for it"""
+    warm_up_score_kernel()
+    return True
+
+warm_up_scoring()
+
 # Apply security middleware
 security_middleware()
 
+class LeaderboardConnection(psycopg2.extensions.connection):
+    """Connection that remembers whether the leaderboard statement is prepared in its session"""
+    leaderboard_prepared = False
+
 # Enhanced database connection with connection pooling
 @st.cache_resource
-def get_database_connection():
-    """Get database connection with pooling"""
+def get_connection_pool():
+    """Thread-safe connection pool shared by every session and rerun"""
     try:
-        conn = psycopg2.connect(
+        return ThreadedConnectionPool(
+            2, 20,
+            connection_factory=LeaderboardConnection,
             host=st.secrets.get("DB_HOST", "localhost"),
             database=st.secrets.get("DB_NAME", "github_leaderboard"),
             user=st.secrets.get("DB_USER", "postgres"),
             password=st.secrets.get("DB_PASSWORD", "password"),
             port=st.secrets.get("DB_PORT", 5432)
         )
-        return conn
     except Exception as e:
         st.error(f"Database connection failed: {e}")
         return None
 
+GRAPHQL_URL = "https://api.github.com/graphql"
+GRAPHQL_BATCH_SIZE = 25  # users per aliased query
+ETAG_CACHE_TTL = 24 * 3600  # how long a validator and its body are kept for revalidation
+REPOS_PAGE_PARAMS = {"per_page": 100, "sort": "updated"}  # GitHub's largest page size
+RATE_LIMIT_RESERVE = 10  # REST calls / GraphQL points kept back from repository pagination
+
+# One page of owned repos with the fields the score uses, plus the cursor for the next page
+REPO_FIELDS_FRAGMENT = """
+fragment RepoFields on RepositoryConnection {
+    pageInfo { hasNextPage endCursor }
+    nodes {
+        stargazerCount
+        forkCount
+        primaryLanguage { name }
+        updatedAt
+        isFork
+    }
+}
+"""
+
+# Profile fields plus the first page of the user's most recently updated owned repos
+USER_FIELDS_FRAGMENT = """
+fragment UserFields on User {
+    login
+    databaseId
+    email
+    name
+    avatarUrl
+    bio
+    location
+    company
+    websiteUrl
+    twitterUsername
+    createdAt
+    followers { totalCount }
+    following { totalCount }
+    publicRepos: repositories(privacy: PUBLIC, ownerAffiliations: OWNER) { totalCount }
+    repositories(first: 100, privacy: PUBLIC, ownerAffiliations: OWNER, orderBy: {field: UPDATED_AT, direction: DESC}) {
+        ...RepoFields
+    }
+}
+""" + REPO_FIELDS_FRAGMENT
+
+# Later repo pages for users with more than 100, following the cursor from the previous page
+USER_REPOS_PAGE_QUERY = """
+query($login: String!, $cursor: String!) {
+    user(login: $login) {
+        repositories(first: 100, after: $cursor, privacy: PUBLIC, ownerAffiliations: OWNER, orderBy: {field: UPDATED_AT, direction: DESC}) {
+            ...RepoFields
+        }
+    }
+}
+""" + REPO_FIELDS_FRAGMENT
+
+def graphql_user_to_rest(node: Dict) -> tuple:
+    """Reshape a GraphQL user node into the REST (user_data, repos) pair the app works with"""
+    repos = [
+        {
+            "stargazers_count": repo["stargazerCount"],
+            "forks_count": repo["forkCount"],
+            "watchers_count": repo["stargazerCount"],  # REST watchers_count mirrors the star count
+            "language": (repo.get("primaryLanguage") or {}).get("name"),
+            "updated_at": repo["updatedAt"],
+            "fork": repo["isFork"],
+        }
+        for repo in node["repositories"]["nodes"]
+    ]
+    user_data = {
+        "login": node["login"],
+        "id": node["databaseId"],
+        "email": node["email"] or None,
+        "name": node["name"],
+        "avatar_url": node["avatarUrl"],
+        "bio": node["bio"],
+        "location": node["location"],
+        "company": node["company"],
+        "blog": node["websiteUrl"],
+        "twitter_username": node["twitterUsername"],
+        "public_repos": node["publicRepos"]["totalCount"],
+        "followers": node["followers"]["totalCount"],
+        "following": node["following"]["totalCount"],
+        "created_at": node["createdAt"],
+    }
+    return user_data, repos
+
+def github_headers(token: Optional[str]) -> Dict:
+    """Authorization header for the configured token, if any"""
+    return {"Authorization": f"token {token}"} if token else {}
+
+@st.cache_resource
+def get_http_client(token: Optional[str]) -> httpx.Client:
+    """Shared HTTP/2 client: one pooled, multiplexed connection set across reruns and sessions"""
+    return httpx.Client(
+        http2=True,
+        headers=github_headers(token),
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=50),
+        timeout=10
+    )
+
 # Enhanced GitHub API with better error handling and caching
 class EnhancedGitHubAPI:
     def __init__(self, token: Optional[str] = None):
         self.token = token or st.secrets.get("GITHUB_TOKEN")
         self.base_url = "https://api.github.com"
-        self.session = requests.Session()
-        if self.token:
-            self.session.headers.update({"Authorization": f"token {self.token}"})
+        self.client = get_http_client(self.token)
+        self.rate_limit_remaining = 5000 if self.token else 60
     
     @components["performance"].measure_execution_time
     def get_user_data(self, username: str) -> Optional[Dict]:
         """Get comprehensive user data"""
-        cache_key = f"user_data_{username}"
-        cached = components["performance"].get_cached_query(cache_key)
-        if cached:
-            return cached
-        
         try:
-            # Basic user info
-            user_response = self.session.get(f"{self.base_url}/users/{username}")
-            if user_response.status_code != 200:
-                return None
-            
-            user_data = user_response.json()
+            return _fetch_user_raw(username, self.token)
+        except Exception as e:
+            st.error(f"Error fetching data for {username}: {e}")
+            return None
+    
+    def fetch_user_uncached(self, username: str) -> Optional[Dict]:
+        """Fetch one user straight from GitHub; errors propagate so they aren't cached"""
+        if self.token:
+            # GraphQL needs a token; one request returns the profile and its repos
+            return self.fetch_users_batch([username]).get(username)
+        
+        return asyncio.run(self._fetch_many_rest([username])).get(username)
+    
+    def fetch_many(self, usernames: List[str]) -> Dict[str, Dict]:
+        """Fetch many users fresh: GraphQL batches with a token, concurrent throttled REST without"""
+        if self.token:
+            results = self.fetch_users_batch(usernames)
+        else:
+            results = asyncio.run(self._fetch_many_rest(usernames))
+        
+        return {username: data for username, data in results.items() if data}
+    
+    async def _fetch_many_rest(self, usernames: List[str]) -> Dict[str, Optional[Dict]]:
+        """Run the REST fetches concurrently, at most 10 in flight for GitHub's secondary rate limit"""
+        semaphore = asyncio.Semaphore(10)
+        
+        async with httpx.AsyncClient(http2=True, timeout=10, headers=github_headers(self.token)) as client:
+            async def _limited(username):
+                async with semaphore:
+                    return await self._fetch_user_rest(client, username)
             
-            # Get repositories with enhanced metrics
-            repos_response = self.session.get(
-                f"{self.base_url}/users/{username}/repos",
-                params={"per_page": 100, "sort": "updated"}
+            results = await asyncio.gather(*(_limited(username) for username in usernames))
+        
+        self.score_users([user for user in results if user])
+        return dict(zip(usernames, results))
+    
+    async def _fetch_user_rest(self, client: httpx.AsyncClient, username: str) -> Optional[Dict]:
+        """Fetch the profile and its repositories side by side; neither request depends on the other"""
+        (user_data, _), repos = await asyncio.gather(
+            self._conditional_get(client, f"{self.base_url}/users/{username}"),
+            self._fetch_repos_rest(client, username)
+        )
+        if user_data is None:
+            return None
+        
+        return self.enhance_user_data(user_data, repos)
+    
+    async def _fetch_repos_rest(self, client: httpx.AsyncClient, username: str) -> List[Dict]:
+        """Every repository page: the first tells us how many there are, the rest are fetched together"""
+        url = f"{self.base_url}/users/{username}/repos"
+        repos, link = await self._conditional_get(client, url, params={"page": 1, **REPOS_PAGE_PARAMS})
+        if not repos:
+            return []
+        
+        last_page = re.search(r'[?&]page=(\d+)[^>]*>; rel="last"', link or "")
+        if not last_page:
+            return repos
+        
+        # Leave headroom in the rate limit for profile fetches; heavy accounts come back truncated instead
+        budget = max(self.rate_limit_remaining - RATE_LIMIT_RESERVE, 0)
+        pages = range(2, min(int(last_page.group(1)), budget + 1) + 1)
+        for page_repos, _ in await asyncio.gather(*(
+            self._conditional_get(client, url, params={"page": page, **REPOS_PAGE_PARAMS}) for page in pages
+        )):
+            repos.extend(page_repos or [])
+        return repos
+    
+    async def _conditional_get(self, client: httpx.AsyncClient, url: str, **kwargs) -> tuple:
+        """GET a JSON body and its Link header, revalidating with If-None-Match; a 304 doesn't count against the rate limit"""
+        performance = components["performance"]
+        cache_key = f"etag_{url}?{httpx.QueryParams(kwargs.get('params'))}"
+        cached = performance.get_cached_query(cache_key)
+        headers = {"If-None-Match": cached["etag"]} if cached else {}
+        
+        response = await client.get(url, headers=headers, **kwargs)
+        if "X-RateLimit-Remaining" in response.headers:
+            self.rate_limit_remaining = int(response.headers["X-RateLimit-Remaining"])
+        if response.status_code == 304 and cached:
+            # Unchanged: reuse the stored body and restart its TTL
+            performance.optimize_query_cache(cache_key, cached, ETAG_CACHE_TTL)
+            return cached["data"], cached.get("link")
+        if response.status_code != 200:
+            return None, None
+        
+        data = response.json()
+        link = response.headers.get("Link")
+        if response.headers.get("ETag"):
+            performance.optimize_query_cache(
+                cache_key, {"etag": response.headers["ETag"], "data": data, "link": link}, ETAG_CACHE_TTL
             )
-            repos = repos_response.json() if repos_response.status_code == 200 else []
-            
-            # Calculate comprehensive score
-            score = self.calculate_enhanced_score(user_data, repos)
-            
-            enhanced_data = {
-                **user_data,
-                "repositories": repos,
-                "calculated_score": score,
-                "last_updated": datetime.now().isoformat()
-            }
+        return data, link
+    
+    def fetch_users_batch(self, usernames: List[str]) -> Dict[str, Dict]:
+        """Fetch many users with one aliased GraphQL query per GRAPHQL_BATCH_SIZE logins"""
+        results = {}
+        for start in range(0, len(usernames), GRAPHQL_BATCH_SIZE):
+            variables = {f"u{i}": login for i, login in enumerate(usernames[start:start + GRAPHQL_BATCH_SIZE])}
+            params = ", ".join(f"${alias}: String!" for alias in variables)
+            fields = " ".join(f"{alias}: user(login: ${alias}) {{ ...UserFields }}" for alias in variables)
+            query = f"query({params}) {{ {fields} }}\n{USER_FIELDS_FRAGMENT}"
             
-            components["performance"].optimize_query_cache(cache_key, enhanced_data, 300)
-            return enhanced_data
+            data = self._post_graphql(query, variables)
             
-        except Exception as e:
-            st.error(f"Error fetching data for {username}: {e}")
-            return None
+            for alias, login in variables.items():
+                node = data.get(alias)
+                if not node:  # Unknown logins come back as null with a NOT_FOUND error
+                    continue
+                self._fetch_remaining_repos_graphql(login, node["repositories"])
+                results[login] = self.enhance_user_data(*graphql_user_to_rest(node))
+        
+        self.score_users(list(results.values()))
+        return results
+    
+    def _post_graphql(self, query: str, variables: Dict) -> Dict:
+        """Run one GraphQL query, tracking the remaining rate limit like the REST path does"""
+        response = self.client.post(GRAPHQL_URL, json={"query": query, "variables": variables})
+        if "X-RateLimit-Remaining" in response.headers:
+            self.rate_limit_remaining = int(response.headers["X-RateLimit-Remaining"])
+        response.raise_for_status()
+        return response.json().get("data") or {}
+    
+    def _fetch_remaining_repos_graphql(self, login: str, repositories: Dict):
+        """Append every further repo page to repositories["nodes"], within the same budget as _fetch_repos_rest"""
+        page_info = repositories["pageInfo"]
+        while page_info["hasNextPage"] and self.rate_limit_remaining > RATE_LIMIT_RESERVE:
+            data = self._post_graphql(USER_REPOS_PAGE_QUERY, {"login": login, "cursor": page_info["endCursor"]})
+            page = (data.get("user") or {}).get("repositories")
+            if not page:
+                return
+            repositories["nodes"].extend(page["nodes"])
+            page_info = page["pageInfo"]
+    
+    def enhance_user_data(self, user_data: Dict, repos: List[Dict]) -> Dict:
+        """Attach repositories to a REST-shaped user payload; score_users fills in calculated_score"""
+        return {
+            **user_data,
+            "repositories": repos,
+            "last_updated": datetime.now().isoformat()
+        }
+    
+    def score_users(self, users: List[Dict]) -> List[Dict]:
+        """Score many users with one matrix-vector product over their stacked feature rows"""
+        if users:
+            features = np.vstack([self.score_feature_row(user, user["repositories"]) for user in users])
+            for user, score in zip(users, score_features(features)):
+                user["calculated_score"] = int(score)
+        return users
     
     def calculate_enhanced_score(self, user_data: Dict, repos: List[Dict]) -> int:
         """Calculate enhanced user score with multiple factors"""
-        score = 0
-        
-        # Base GitHub metrics
-        score += user_data.get("public_repos", 0) * 10
-        score += user_data.get("followers", 0) * 5
-        score += user_data.get("following", 0) * 2
-        
-        # Repository quality metrics
-        for repo in repos:
-            if not repo.get("fork", False):  # Original repos only
-                score += repo.get("stargazers_count", 0) * 3
-                score += repo.get("forks_count", 0) * 5
-                score += repo.get("watchers_count", 0) * 2
-                
-                # Language diversity bonus
-                if repo.get("language"):
-                    score += 5
-                
-                # Recent activity bonus
-                updated = repo.get("updated_at", "")
-                if updated:
-                    try:
-                        update_date = datetime.fromisoformat(updated.replace('Z', '+00:00'))
-                        days_since_update = (datetime.now().replace(tzinfo=update_date.tzinfo) - update_date).days
-                        if days_since_update < 30:
-                            score += 20
-                        elif days_since_update < 90:
-                            score += 10
-                    except:
-                        pass
-        
-        # Account age bonus
+        return int(score_features(self.score_feature_row(user_data, repos)))
+    
+    def score_feature_row(self, user_data: Dict, repos: List[Dict]) -> np.ndarray:
+        """The SCORE_WEIGHTS feature vector for one user"""
+        # Repository quality metrics, computed over column arrays rather than per repo
+        if repos:
+            count = len(repos)
+            stars = np.fromiter((repo.get("stargazers_count") or 0 for repo in repos), dtype=np.int64, count=count)
+            forks = np.fromiter((repo.get("forks_count") or 0 for repo in repos), dtype=np.int64, count=count)
+            watchers = np.fromiter((repo.get("watchers_count") or 0 for repo in repos), dtype=np.int64, count=count)
+            is_fork = np.fromiter((bool(repo.get("fork", False)) for repo in repos), dtype=bool, count=count)
+            has_lang = np.fromiter((bool(repo.get("language")) for repo in repos), dtype=bool, count=count)
+            
+            # Repos without an update date become NaN and earn no recency bonus
+            days = days_since([repo.get("updated_at") for repo in repos])
+            repo_row = repo_features(stars, forks, watchers, is_fork, has_lang, days)
+        else:
+            repo_row = np.zeros(6)
+        
+        # Account age
+        years_active = 0.0
         created_at = user_data.get("created_at", "")
         if created_at:
             try:
-                creation_date = datetime.fromisoformat(created_at.replace('Z', '+00:00'))
-                years_active = (datetime.now().replace(tzinfo=creation_date.tzinfo) - creation_date).days / 365
-                score += int(years_active * 50)
-            except:
+                years_active = days_since([created_at])[0] / 365
+            except ValueError:
                 pass
         
-        return max(0, score)
+        return np.concatenate((
+            [user_data.get("public_repos") or 0, user_data.get("followers") or 0, user_data.get("following") or 0],
+            repo_row,
+            [years_active],
+        ))
 
 # Initialize enhanced GitHub API
+@st.cache_data(ttl=300, show_spinner=False, max_entries=1024)
+def _fetch_user_raw(username: str, token: Optional[str]) -> Optional[Dict]:
+    """One real GitHub fetch per (username, token) every five minutes, shared by all sessions"""
+    return EnhancedGitHubAPI(token).fetch_user_uncached(username)
+
 github_api = EnhancedGitHubAPI()
 
+# Shared by the single-user and bulk upserts; {values} is one row template or execute_values' %s
+USER_UPSERT_SQL = """
+    INSERT INTO users (
+        github_username, github_id, email, full_name, avatar_url,
+        bio, location, company, blog, twitter_username,
+        score, public_repos, followers, following,
+        account_created, last_updated
+    ) VALUES {values}
+    ON CONFLICT (github_username) DO UPDATE SET
+        github_id = EXCLUDED.github_id,
+        email = EXCLUDED.email,
+        full_name = EXCLUDED.full_name,
+        avatar_url = EXCLUDED.avatar_url,
+        bio = EXCLUDED.bio,
+        location = EXCLUDED.location,
+        company = EXCLUDED.company,
+        blog = EXCLUDED.blog,
+        twitter_username = EXCLUDED.twitter_username,
+        score = EXCLUDED.score,
+        public_repos = EXCLUDED.public_repos,
+        followers = EXCLUDED.followers,
+        following = EXCLUDED.following,
+        last_updated = NOW()
+    RETURNING id;
+"""
+
+USER_ROW_TEMPLATE = """(
+    %(login)s, %(id)s, %(email)s, %(name)s, %(avatar_url)s,
+    %(bio)s, %(location)s, %(company)s, %(blog)s, %(twitter_username)s,
+    %(calculated_score)s, %(public_repos)s, %(followers)s, %(following)s,
+    %(created_at)s, NOW()
+)"""
+
+# Only what the leaderboard renders; bio, preferences and the other wide columns stay in users
+LEADERBOARD_COLUMNS = (
+    "id", "github_username", "full_name", "avatar_url", "score", "public_repos",
+    "rank", "activity_count", "last_activity", "total_activity_points",
+)
+
+# Ranked users with their activity aggregates, recomputed by REFRESH rather than per request
+LEADERBOARD_VIEW_SQL = """
+    CREATE MATERIALIZED VIEW IF NOT EXISTS leaderboard_mv AS
+    SELECT 
+        u.id, u.github_username, u.full_name, u.avatar_url, u.score, u.public_repos,
+        ROW_NUMBER() OVER (ORDER BY u.score DESC) as rank,
+        COUNT(ua.id) as activity_count,
+        MAX(ua.timestamp) as last_activity,
+        COALESCE(SUM(ua.points), 0) as total_activity_points
+    FROM users u
+    LEFT JOIN user_activities ua ON u.id = ua.user_id
+    WHERE u.is_active = TRUE AND u.score > 0
+    GROUP BY u.id
+"""
+
+LEADERBOARD_VIEW_REFRESH_MINUTES = 1
+
+# Parsed and planned once per pooled session, then run with EXECUTE leaderboard_stmt(limit).
+# Explicit projection so a view created before LEADERBOARD_COLUMNS existed is read just as narrowly
+LEADERBOARD_PREPARE_SQL = f"""
+    PREPARE leaderboard_stmt(int) AS
+    SELECT {", ".join(LEADERBOARD_COLUMNS)}
+    FROM leaderboard_mv ORDER BY score DESC LIMIT $1
+"""
+
+# Activity rows are buffered and written in batches; these types still go straight to the database
+ACTIVITY_FLUSH_ROWS = 100
+ACTIVITY_FLUSH_SECONDS = 5
+IMMEDIATE_ACTIVITY_TYPES = {"login"}
+
+ACTIVITY_INSERT_SQL = """
+    INSERT INTO user_activities (user_id, activity_type, description, points, metadata)
+    VALUES %s
+"""
+
+# Last relation created by create_enhanced_tables; bump it whenever the DDL there changes
+SCHEMA_PROBE_RELATION = "public.idx_leaderboard_mv_score"
+
 # Enhanced database operations
 class DatabaseManager:
-    def __init__(self, conn):
-        self.conn = conn
+    def __init__(self, pool: ThreadedConnectionPool):
+        self.pool = pool
+        self._activity_buf: list = []
+        self._activity_lock = threading.Lock()
+        # Bumped after each successful view refresh; the leaderboard cache keys on it
+        self.view_generation = 0
+        threading.Thread(target=self._flush_activities_periodically, daemon=True).start()
+    
+    @contextmanager
+    def connection(self):
+        """Check a pooled connection out for one unit of work; the pool rolls back anything left open"""
+        conn = self.pool.getconn()
+        try:
+            yield conn
+        finally:
+            self.pool.putconn(conn)
     
     def create_enhanced_tables(self):
         """Create enhanced database schema"""
-        cursor = self.conn.cursor()
-        
-        # Enhanced users table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS users (
-                id SERIAL PRIMARY KEY,
-                github_username VARCHAR(255) UNIQUE NOT NULL,
-                github_id INTEGER UNIQUE,
-                email VARCHAR(255),
-                full_name VARCHAR(255),
-                avatar_url TEXT,
-                bio TEXT,
-                location VARCHAR(255),
-                company VARCHAR(255),
-                blog VARCHAR(255),
-                twitter_username VARCHAR(255),
-                score INTEGER DEFAULT 0,
-                public_repos INTEGER DEFAULT 0,
-                followers INTEGER DEFAULT 0,
-                following INTEGER DEFAULT 0,
-                total_stars INTEGER DEFAULT 0,
-                total_forks INTEGER DEFAULT 0,
-                account_created DATE,
-                last_updated TIMESTAMP DEFAULT NOW(),
-                created_at TIMESTAMP DEFAULT NOW(),
-                is_active BOOLEAN DEFAULT TRUE,
-                preferences JSONB DEFAULT '{}',
-                achievements JSONB DEFAULT '[]'
-            )
-        """)
-        
-        # User activities table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS user_activities (
-                id SERIAL PRIMARY KEY,
-                user_id INTEGER REFERENCES users(id),
-                activity_type VARCHAR(100) NOT NULL,
-                description TEXT,
-                points INTEGER DEFAULT 0,
-                metadata JSONB DEFAULT '{}',
-                timestamp TIMESTAMP DEFAULT NOW()
-            )
-        """)
-        
-        # User sessions table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS user_sessions (
-                id SERIAL PRIMARY KEY,
-                user_id INTEGER REFERENCES users(id),
-                session_token VARCHAR(255) UNIQUE NOT NULL,
-                created_at TIMESTAMP DEFAULT NOW(),
-                expires_at TIMESTAMP NOT NULL,
-                is_active BOOLEAN DEFAULT TRUE,
-                ip_address INET,
-                user_agent TEXT
-            )
-        """)
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            
+            # Everything below commits together, so its last object existing means the schema is current
+            cursor.execute("SELECT to_regclass(%s)", (SCHEMA_PROBE_RELATION,))
+            if cursor.fetchone()[0]:
+                conn.rollback()
+                cursor.close()
+                return
+        
+            # Enhanced users table
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS users (
+                    id SERIAL PRIMARY KEY,
+                    github_username VARCHAR(255) UNIQUE NOT NULL,
+                    github_id INTEGER UNIQUE,
+                    email VARCHAR(255),
+                    full_name VARCHAR(255),
+                    avatar_url TEXT,
+                    bio TEXT,
+                    location VARCHAR(255),
+                    company VARCHAR(255),
+                    blog VARCHAR(255),
+                    twitter_username VARCHAR(255),
+                    score INTEGER DEFAULT 0,
+                    public_repos INTEGER DEFAULT 0,
+                    followers INTEGER DEFAULT 0,
+                    following INTEGER DEFAULT 0,
+                    total_stars INTEGER DEFAULT 0,
+                    total_forks INTEGER DEFAULT 0,
+                    account_created DATE,
+                    last_updated TIMESTAMP DEFAULT NOW(),
+                    created_at TIMESTAMP DEFAULT NOW(),
+                    is_active BOOLEAN DEFAULT TRUE,
+                    preferences JSONB DEFAULT '{}',
+                    achievements JSONB DEFAULT '[]'
+                )
+            """)
         
-        # Create indexes for performance
-        indexes = [
-            "CREATE INDEX IF NOT EXISTS idx_users_github_username ON users(github_username);",
-            "CREATE INDEX IF NOT EXISTS idx_users_score ON users(score DESC);",
-            "CREATE INDEX IF NOT EXISTS idx_users_last_updated ON users(last_updated);",
-            "CREATE INDEX IF NOT EXISTS idx_activities_user_id ON user_activities(user_id);",
-            "CREATE INDEX IF NOT EXISTS idx_activities_timestamp ON user_activities(timestamp DESC);",
-            "CREATE INDEX IF NOT EXISTS idx_sessions_token ON user_sessions(session_token);",
-            "CREATE INDEX IF NOT EXISTS idx_sessions_user_id ON user_sessions(user_id);"
-        ]
+            # User activities table
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS user_activities (
+                    id SERIAL PRIMARY KEY,
+                    user_id INTEGER REFERENCES users(id),
+                    activity_type VARCHAR(100) NOT NULL,
+                    description TEXT,
+                    points INTEGER DEFAULT 0,
+                    metadata JSONB DEFAULT '{}',
+                    timestamp TIMESTAMP DEFAULT NOW()
+                )
+            """)
         
-        for index in indexes:
-            cursor.execute(index)
+            # User sessions table
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS user_sessions (
+                    id SERIAL PRIMARY KEY,
+                    user_id INTEGER REFERENCES users(id),
+                    session_token VARCHAR(255) UNIQUE NOT NULL,
+                    created_at TIMESTAMP DEFAULT NOW(),
+                    expires_at TIMESTAMP NOT NULL,
+                    is_active BOOLEAN DEFAULT TRUE,
+                    ip_address INET,
+                    user_agent TEXT
+                )
+            """)
+        
+            # Create indexes for performance
+            indexes = [
+                "CREATE INDEX IF NOT EXISTS idx_users_github_username ON users(github_username);",
+                # Partial covering index: the leaderboard's filter, order and columns, no heap fetches
+                """CREATE INDEX IF NOT EXISTS idx_users_lb ON users(score DESC)
+                   INCLUDE (github_username, full_name, avatar_url, public_repos)
+                   WHERE is_active AND score > 0;""",
+                "DROP INDEX IF EXISTS idx_users_score;",
+                "CREATE INDEX IF NOT EXISTS idx_users_last_updated ON users(last_updated);",
+                "CREATE INDEX IF NOT EXISTS idx_activities_user_id ON user_activities(user_id);",
+                "CREATE INDEX IF NOT EXISTS idx_activities_timestamp ON user_activities(timestamp DESC);",
+                "CREATE INDEX IF NOT EXISTS idx_sessions_token ON user_sessions(session_token);",
+                "CREATE INDEX IF NOT EXISTS idx_sessions_user_id ON user_sessions(user_id);"
+            ]
+        
+            for index in indexes:
+                cursor.execute(index)
+            
+            # Leaderboard snapshot; the unique index is what allows REFRESH ... CONCURRENTLY
+            cursor.execute(LEADERBOARD_VIEW_SQL)
+            cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_leaderboard_mv_id ON leaderboard_mv(id);")
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_leaderboard_mv_score ON leaderboard_mv(score DESC)
+                INCLUDE (id, github_username, full_name, avatar_url, public_repos, rank,
+                         activity_count, last_activity, total_activity_points);
+            """)
         
-        self.conn.commit()
-        cursor.close()
+            conn.commit()
+            cursor.close()
+    
+    def refresh_leaderboard_view(self):
+        """Recompute leaderboard_mv without blocking readers of the current snapshot"""
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            
+            try:
+                cursor.execute("REFRESH MATERIALIZED VIEW CONCURRENTLY leaderboard_mv;")
+                conn.commit()
+                self.view_generation += 1
+            except Exception as e:
+                conn.rollback()
+                print(f"Error refreshing leaderboard view: {e}")
+            finally:
+                cursor.close()
     
     def upsert_user(self, user_data: Dict) -> int:
         """Insert or update user with enhanced data"""
-        cursor = self.conn.cursor()
+        with self.connection() as conn:
+            cursor = conn.cursor()
         
-        try:
-            cursor.execute("""
-                INSERT INTO users (
-                    github_username, github_id, email, full_name, avatar_url,
-                    bio, location, company, blog, twitter_username,
-                    score, public_repos, followers, following,
-                    account_created, last_updated
-                ) VALUES (
-                    %(login)s, %(id)s, %(email)s, %(name)s, %(avatar_url)s,
-                    %(bio)s, %(location)s, %(company)s, %(blog)s, %(twitter_username)s,
-                    %(calculated_score)s, %(public_repos)s, %(followers)s, %(following)s,
-                    %(created_at)s, NOW()
-                )
-                ON CONFLICT (github_username) DO UPDATE SET
-                    github_id = EXCLUDED.github_id,
-                    email = EXCLUDED.email,
-                    full_name = EXCLUDED.full_name,
-                    avatar_url = EXCLUDED.avatar_url,
-                    bio = EXCLUDED.bio,
-                    location = EXCLUDED.location,
-                    company = EXCLUDED.company,
-                    blog = EXCLUDED.blog,
-                    twitter_username = EXCLUDED.twitter_username,
-                    score = EXCLUDED.score,
-                    public_repos = EXCLUDED.public_repos,
-                    followers = EXCLUDED.followers,
-                    following = EXCLUDED.following,
-                    last_updated = NOW()
-                RETURNING id;
-            """, user_data)
+            try:
+                cursor.execute(USER_UPSERT_SQL.format(values=USER_ROW_TEMPLATE), user_data)
             
-            user_id = cursor.fetchone()[0]
-            self.conn.commit()
+                user_id = cursor.fetchone()[0]
+                conn.commit()
             
-            # Log activity
-            self.log_activity(user_id, "profile_updated", "Profile data refreshed", 10)
+                # Log activity
+                self.log_activity(user_id, "profile_updated", "Profile data refreshed", 10)
             
-            return user_id
+                return user_id
             
-        except Exception as e:
-            self.conn.rollback()
-            st.error(f"Database error: {e}")
-            return None
-        finally:
-            cursor.close()
+            except Exception as e:
+                conn.rollback()
+                st.error(f"Database error: {e}")
+                return None
+            finally:
+                cursor.close()
     
-    def log_activity(self, user_id: int, activity_type: str, description: str, points: int = 0, metadata: Dict = None):
-        """Log user activity"""
-        cursor = self.conn.cursor()
+    def upsert_users_bulk(self, users: List[Dict]) -> List[int]:
+        """Insert or update many users with one statement and one commit"""
+        with self.connection() as conn:
+            # ON CONFLICT can't touch the same row twice in one statement, so keep one payload per login
+            users = list({user["login"]: user for user in users}.values())
+            if not users:
+                return []
         
-        try:
-            cursor.execute("""
-                INSERT INTO user_activities (user_id, activity_type, description, points, metadata)
-                VALUES (%s, %s, %s, %s, %s)
-            """, (user_id, activity_type, description, points, json.dumps(metadata or {})))
+            cursor = conn.cursor()
+        
+            try:
+                rows = execute_values(
+                    cursor, USER_UPSERT_SQL.format(values="%s"), users,
+                    template=USER_ROW_TEMPLATE, page_size=len(users), fetch=True
+                )
+                user_ids = [row[0] for row in rows]
             
-            self.conn.commit()
-        except Exception as e:
-            self.conn.rollback()
-        finally:
-            cursor.close()
+                execute_values(cursor, """
+                    INSERT INTO user_activities (user_id, activity_type, description, points)
+                    VALUES %s
+                """, [(user_id, "profile_updated", "Profile data refreshed", 10) for user_id in user_ids])
+            
+                conn.commit()
+                return user_ids
+            
+            except Exception as e:
+                conn.rollback()
+                st.error(f"Database error: {e}")
+                return []
+            finally:
+                cursor.close()
     
-    def get_leaderboard(self, limit: int = 50) -> List[Dict]:
-        """Get enhanced leaderboard"""
-        cursor = self.conn.cursor()
+    def get_active_usernames(self) -> List[str]:
+        """GitHub usernames of every active user"""
+        with self.connection() as conn:
+            cursor = conn.cursor()
         
-        try:
-            cursor.execute("""
-                SELECT 
-                    u.*,
-                    ROW_NUMBER() OVER (ORDER BY u.score DESC) as rank,
-                    COUNT(ua.id) as activity_count,
-                    MAX(ua.timestamp) as last_activity,
-                    COALESCE(SUM(ua.points), 0) as total_activity_points
-                FROM users u
-                LEFT JOIN user_activities ua ON u.id = ua.user_id
-                WHERE u.is_active = TRUE AND u.score > 0
-                GROUP BY u.id
-                ORDER BY u.score DESC
-                LIMIT %s;
-            """, (limit,))
-            
-            columns = [desc[0] for desc in cursor.description]
-            results = cursor.fetchall()
+            try:
+                cursor.execute("SELECT github_username FROM users WHERE is_active = TRUE")
+                return [row[0] for row in cursor.fetchall()]
+            finally:
+                cursor.close()
+    
+    def get_header_stats(self) -> tuple:
+        """Active user count and top score in one round trip"""
+        with self.connection() as conn:
+            cursor = conn.cursor()
             
-            return [dict(zip(columns, row)) for row in results]
+            try:
+                cursor.execute("SELECT COUNT(*) FILTER (WHERE is_active), COALESCE(MAX(score), 0) FROM users")
+                return cursor.fetchone()
+            finally:
+                cursor.close()
+    
+    def log_activity(self, user_id: int, activity_type: str, description: str, points: int = 0, metadata: Dict = None):
+        """Log user activity; routine rows are buffered and flushed in batches"""
+        row = (user_id, activity_type, description, points, orjson.dumps(metadata or {}).decode())
+        
+        if activity_type in IMMEDIATE_ACTIVITY_TYPES:
+            self._insert_activities([row])
+            return
+        
+        with self._activity_lock:
+            self._activity_buf.append(row)
+            flush_now = len(self._activity_buf) >= ACTIVITY_FLUSH_ROWS
+        
+        if flush_now:
+            self._flush_activities()
+    
+    def _flush_activities(self):
+        """Write every buffered activity row with one statement and one commit"""
+        with self._activity_lock:
+            rows, self._activity_buf = self._activity_buf, []
+        
+        if rows:
+            self._insert_activities(rows)
+    
+    def _flush_activities_periodically(self):
+        """Background loop that bounds how long a buffered row can wait"""
+        while True:
+            time.sleep(ACTIVITY_FLUSH_SECONDS)
+            self._flush_activities()
+    
+    def _insert_activities(self, rows: List[tuple]):
+        """Insert activity rows; failures are dropped, as activity logging is best-effort"""
+        with self.connection() as conn:
+            cursor = conn.cursor()
+        
+            try:
+                execute_values(cursor, ACTIVITY_INSERT_SQL, rows, page_size=len(rows))
+                conn.commit()
+            except Exception as e:
+                conn.rollback()
+                print(f"Error logging activities: {e}")
+            finally:
+                cursor.close()
+    
+    def get_leaderboard(self, limit: int = 50) -> pd.DataFrame:
+        """Get enhanced leaderboard as a DataFrame (rows are decoded into column buffers, not per-row dicts)"""
+        with self.connection() as conn:
+            try:
+                if not conn.leaderboard_prepared:
+                    # Prepared statements are session-scoped and survive rollbacks, so once per connection is enough
+                    with conn.cursor() as cursor:
+                        cursor.execute(LEADERBOARD_PREPARE_SQL)
+                    conn.commit()
+                    conn.leaderboard_prepared = True
+                
+                return pd.read_sql_query("EXECUTE leaderboard_stmt(%s)", conn, params=(limit,))
             
-        except Exception as e:
-            st.error(f"Error fetching leaderboard: {e}")
-            return []
-        finally:
-            cursor.close()
+            except Exception as e:
+                conn.rollback()
+                st.error(f"Error fetching leaderboard: {e}")
+                return pd.DataFrame()
+
+@st.cache_resource
+def get_db_manager(_pool: ThreadedConnectionPool) -> DatabaseManager:
+    """One manager per process, so its activity buffer and flush thread outlive script reruns"""
+    manager = DatabaseManager(_pool)
+    manager.create_enhanced_tables()
+    return manager
 
 # Initialize database with graceful fallback
-conn = get_database_connection()
-if conn:
-    db_manager = DatabaseManager(conn)
-    db_manager.create_enhanced_tables()
+pool = get_connection_pool()
+if pool:
+    db_manager = get_db_manager(pool)
     DATABASE_AVAILABLE = True
 else:
     DATABASE_AVAILABLE = False
     # Create a mock database manager for demo purposes
     class MockDatabaseManager:
+        view_generation = 0
         def upsert_user(self, user_data): return 1
+        def upsert_users_bulk(self, users): return []
+        def get_active_usernames(self): return []
         def log_activity(self, user_id, activity_type, description, points=0): pass
-        def get_leaderboard(self, limit=50): return []
+        def get_leaderboard(self, limit=50): return pd.DataFrame()
+        def refresh_leaderboard_view(self): pass
     db_manager = MockDatabaseManager()
 
+@st.cache_resource
+def start_leaderboard_refresher():
+    """Refresh the leaderboard snapshot in the background, once per process"""
+    # Imported here: utils.background_tasks pulls in psycopg 3, which only the database-backed path needs
+    from utils.background_tasks import start_background_scheduler
+    return start_background_scheduler(db_manager.refresh_leaderboard_view, LEADERBOARD_VIEW_REFRESH_MINUTES)
+
+if DATABASE_AVAILABLE:
+    start_leaderboard_refresher()
+
+@st.cache_data(ttl=30, show_spinner=False)
+def header_stats() -> tuple:
+    """Header stats shared by every page and session, re-queried at most every 30 seconds"""
+    return db_manager.get_header_stats()
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def _cached_leaderboard(limit: int, gen: int) -> pd.DataFrame:
+    """Leaderboard shared by every session; a new generation (a view refresh) forces a re-read"""
+    return db_manager.get_leaderboard(limit)
+
+def leaderboard(limit: int = 50) -> pd.DataFrame:
+    """Cached leaderboard keyed on the view's refresh counter, so a render costs no extra query"""
+    return _cached_leaderboard(limit, db_manager.view_generation)
+
+RANK_MEDALS = {1: "🥇", 2: "🥈", 3: "🥉"}
+
 # Enhanced Authentication System
 class AuthManager:
     def __init__(self, db_manager: DatabaseManager):
@@ -488,14 +915,9 @@ def create_enhanced_header():
     
     with col3:
         # Real-time stats
-        if DATABASE_AVAILABLE and conn:
+        if DATABASE_AVAILABLE:
             try:
-                cursor = conn.cursor()
-                cursor.execute("SELECT COUNT(*) FROM users WHERE is_active = TRUE")
-                total_users = cursor.fetchone()[0]
-                cursor.execute("SELECT MAX(score) FROM users")
-                max_score = cursor.fetchone()[0] or 0
-                cursor.close()
+                total_users, max_score = header_stats()
                 
                 st.markdown(f"""
                 <div style="color: white; text-align: center;">
@@ -667,46 +1089,44 @@ def create_dashboard():
     st.subheader("🏆 Global Leaderboard")
     
     if DATABASE_AVAILABLE:
-        leaderboard_data = db_manager.get_leaderboard(50)
+        if st.button("🔄 Refresh Leaderboard"):
+            try:
+                with st.spinner("Refreshing developer profiles..."):
+                    # Batched GitHub fetch, then one multi-row upsert for everyone
+                    usernames = db_manager.get_active_usernames()
+                    user_ids = db_manager.upsert_users_bulk(list(github_api.fetch_many(usernames).values()))
+                    db_manager.refresh_leaderboard_view()
+                st.success(f"✅ Refreshed {len(user_ids)} profiles")
+            except httpx.HTTPError as e:
+                # Rate limits and GitHub outages leave the current leaderboard in place
+                st.error(f"Couldn't refresh from GitHub, showing the last leaderboard: {e}")
         
-        if leaderboard_data:
-            # Create interactive leaderboard
-            for i, user in enumerate(leaderboard_data[:10]):
-                with st.container():
-                    col1, col2, col3, col4, col5 = st.columns([1, 3, 2, 2, 2])
-                    
-                    with col1:
-                        rank = user['rank']
-                        if rank == 1:
-                            st.markdown("🥇")
-                        elif rank == 2:
-                            st.markdown("🥈")
-                        elif rank == 3:
-                            st.markdown("🥉")
-                        else:
-                            st.markdown(f"**#{rank}**")
-                    
-                    with col2:
-                        st.markdown(f"""
-                        <div class="leaderboard-item">
-                            <img src="{user['avatar_url']}" class="user-avatar" />
-                            <div>
-                                <div style="font-weight: 600;">{user['full_name'] or user['github_username']}</div>
-                                <div style="opacity: 0.7;">@{user['github_username']}</div>
-                            </div>
-                        </div>
-                        """, unsafe_allow_html=True)
-                    
-                    with col3:
-                        st.metric("Score", f"{user['score']:,}")
-                    
-                    with col4:
-                        st.metric("Repos", user['public_repos'])
-                    
-                    with col5:
-                        if st.button("View Profile", key=f"profile_{user['id']}"):
-                            st.session_state['viewing_profile'] = user['github_username']
-                            st.rerun()
+        leaderboard_data = leaderboard(50)
+        
+        if not leaderboard_data.empty:
+            # One dataframe element for the whole table instead of a row of widgets per user
+            top = leaderboard_data.head(10)[["rank", "avatar_url", "full_name", "github_username", "score", "public_repos"]].copy()
+            top["rank"] = top["rank"].map(lambda rank: RANK_MEDALS.get(rank, f"#{rank}"))
+            top["full_name"] = top["full_name"].fillna(top["github_username"])
+            
+            st.dataframe(
+                top,
+                hide_index=True,
+                use_container_width=True,
+                column_config={
+                    "rank": st.column_config.TextColumn("Rank", width="small"),
+                    "avatar_url": st.column_config.ImageColumn("", width="small"),
+                    "full_name": st.column_config.TextColumn("Developer"),
+                    "github_username": st.column_config.TextColumn("Username"),
+                    "score": st.column_config.NumberColumn("Score", format="%d"),
+                    "public_repos": st.column_config.NumberColumn("Repos"),
+                },
+            )
+            
+            selected = st.selectbox("View profile", top["github_username"], index=None, placeholder="Choose a developer")
+            if selected and selected != st.session_state.get('viewing_profile'):
+                st.session_state['viewing_profile'] = selected
+                st.rerun()
         else:
             st.info("No leaderboard data available yet. More users needed!")
     else:
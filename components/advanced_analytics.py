@@ -194,33 +194,17 @@ class GitHubAnalytics:
         
         return fig
     
-    def perform_user_clustering(self, all_users_data):
-        """Perform ML clustering to segment users"""
-        if len(all_users_data) < 3:
+    def perform_user_clustering(self, usernames, features):
+        """Perform ML clustering to segment users from an (n_users, 7) score matrix"""
+        if len(usernames) < 3:
             return None
         
-        # Prepare features for clustering
-        features = []
-        usernames = []
-        
-        for user_data in all_users_data:
-            features.append([
-                user_data.get('pull_requests_opened', 0),
-                user_data.get('pull_requests_merged', 0),
-                user_data.get('issues_created', 0),
-                user_data.get('issues_closed', 0),
-                user_data.get('repos_contributed_to', 0),
-                user_data.get('starred_repositories', 0),
-                user_data.get('commit_changes', 0)
-            ])
-            usernames.append(user_data.get('username', 'Unknown'))
-        
         # Standardize features
         scaler = StandardScaler()
         features_scaled = scaler.fit_transform(features)
         
         # Perform clustering
-        n_clusters = min(4, len(all_users_data))
+        n_clusters = min(4, len(usernames))
         kmeans = KMeans(n_clusters=n_clusters, random_state=42)
         clusters = kmeans.fit_predict(features_scaled)
         
@@ -231,8 +215,9 @@ class GitHubAnalytics:
                         '🌱 Growing Contributors', '👶 New Members']
         
         for i in range(n_clusters):
-            cluster_users = [usernames[j] for j in range(len(usernames)) if clusters[j] == i]
-            cluster_scores = [sum(features[j]) for j in range(len(features)) if clusters[j] == i]
+            in_cluster = clusters == i
+            cluster_users = usernames[in_cluster]
+            cluster_scores = features[in_cluster].sum(axis=1)
             
             fig.add_trace(go.Scatter(
                 x=range(len(cluster_users)),
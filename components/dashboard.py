@@ -2,14 +2,13 @@
 Enhanced dashboard components with data visualization
 """
 import streamlit as st
-import plotly.express as px
-import plotly.graph_objects as go
 import pandas as pd
 from datetime import datetime, timedelta
 import requests
 
 def create_user_analytics_chart(username, scores_data):
     """Create analytics charts for individual user"""
+    import plotly.express as px
     
     # Contribution distribution pie chart
     contribution_data = {
@@ -39,6 +38,7 @@ def create_user_analytics_chart(username, scores_data):
 
 def create_leaderboard_chart(leaderboard_data):
     """Create a horizontal bar chart for top performers"""
+    import plotly.graph_objects as go
     if not leaderboard_data:
         return None
     
@@ -74,6 +74,7 @@ def create_leaderboard_chart(leaderboard_data):
 
 def create_activity_timeline():
     """Create a mock activity timeline (can be enhanced with real data)"""
+    import plotly.express as px
     # This is a placeholder - you can enhance this with real user activity data
     dates = pd.date_range(start='2024-01-01', end='2024-12-31', freq='W')
     activity_data = pd.DataFrame({
@@ -100,22 +101,26 @@ def create_activity_timeline():
     
     return fig
 
+def parse_github_profile(data, username):
+    """Pick the profile fields used for display from a GitHub /users payload"""
+    return {
+        'avatar_url': data.get('avatar_url', ''),
+        'name': data.get('name', username),
+        'bio': data.get('bio', ''),
+        'followers': data.get('followers', 0),
+        'following': data.get('following', 0),
+        'public_repos': data.get('public_repos', 0),
+        'created_at': data.get('created_at', ''),
+        'location': data.get('location', 'Unknown')
+    }
+
+@st.cache_data(ttl=3600, show_spinner=False)
 def fetch_github_profile_data(username):
     """Fetch additional GitHub profile data for enhanced display"""
     try:
         response = requests.get(f"https://api.github.com/users/{username}")
         if response.status_code == 200:
-            data = response.json()
-            return {
-                'avatar_url': data.get('avatar_url', ''),
-                'name': data.get('name', username),
-                'bio': data.get('bio', ''),
-                'followers': data.get('followers', 0),
-                'following': data.get('following', 0),
-                'public_repos': data.get('public_repos', 0),
-                'created_at': data.get('created_at', ''),
-                'location': data.get('location', 'Unknown')
-            }
+            return parse_github_profile(response.json(), username)
     except:
         pass
     return None
@@ -8,13 +8,21 @@ import redis
 import psutil
 import logging
 from datetime import datetime, timedelta
+from decimal import Decimal
 from functools import wraps
 import json
+import orjson
 import asyncio
 from typing import Dict, List, Optional
 import jwt
 from cryptography.fernet import Fernet
 
+def _orjson_default(value):
+    """Serialize values orjson doesn't handle natively (NUMERIC columns arrive as Decimal)"""
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError
+
 class SecurityManager:
     """Advanced security management"""
     
@@ -210,12 +218,27 @@ class AuditLogger:
             f"Security event - Type: {event_type}, Details: {json.dumps(details)}"
         )
 
+@st.cache_resource
+def get_query_cache_client() -> Optional[redis.Redis]:
+    """Shared Redis client for the query cache, or None when Redis isn't reachable"""
+    try:
+        client = redis.Redis(
+            host=st.secrets.get("redis_host", "localhost"),
+            port=st.secrets.get("redis_port", 6379)
+        )
+        client.ping()
+        return client
+    except Exception:
+        return None
+
 class PerformanceMonitor:
     """Performance monitoring and optimization"""
     
     def __init__(self):
         self.metrics = {}
         self.start_time = time.time()
+        # Shared across workers and processes; falls back to the per-session cache below
+        self.redis_client = get_query_cache_client()
     
     def measure_execution_time(self, func):
         """Decorator to measure function execution time"""
@@ -252,7 +275,18 @@ class PerformanceMonitor:
         }
     
     def optimize_query_cache(self, query_key: str, result: any, ttl: int = 300):
-        """Cache query results"""
+        """Cache query results. Through Redis they round-trip as JSON: tuples come back as lists,
+        datetimes as ISO strings and Decimals as floats; the session fallback keeps them as-is"""
+        if self.redis_client:
+            try:
+                self.redis_client.set(f"q:{query_key}", orjson.dumps(result, default=_orjson_default), ex=ttl)
+                # Don't let an older session-only copy outlive the fresh shared one
+                st.session_state.get('query_cache', {}).pop(query_key, None)
+                return
+            except (redis.RedisError, TypeError):
+                # Unserializable results (orjson.JSONEncodeError is a TypeError) stay in the session cache
+                pass
+        
         if 'query_cache' not in st.session_state:
             st.session_state.query_cache = {}
         
@@ -264,6 +298,16 @@ class PerformanceMonitor:
     
     def get_cached_query(self, query_key: str):
         """Get cached query result"""
+        if self.redis_client:
+            try:
+                cached = self.redis_client.get(f"q:{query_key}")
+                if cached:
+                    return orjson.loads(cached)
+            except redis.RedisError:
+                pass
+        
+        # A Redis miss may still be a result that couldn't be written there (see optimize_query_cache)
+        
         cache = st.session_state.get('query_cache', {})
         
         if query_key in cache:
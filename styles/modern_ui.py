@@ -483,8 +483,8 @@ def create_metric_card(title, value, icon="📊"):
     </div>
     """
 
-def create_leaderboard_item(rank, username, score, github_url=None):
-    """Create a styled leaderboard item"""
+def create_leaderboard_item(rank, username, score, github_url=None, suffix=""):
+    """Create a styled leaderboard item; suffix is appended after the username (e.g. update age)"""
     github_link = f'<a href="{github_url}" target="_blank" style="text-decoration: none; color: #667eea;">@{username}</a>' if github_url else f"@{username}"
     
     # Determine rank badge color
@@ -496,7 +496,7 @@ def create_leaderboard_item(rank, username, score, github_url=None):
             {rank}
         </div>
         <div class="user-info">
-            <div class="username">{github_link}</div>
+            <div class="username">{github_link}{suffix}</div>
         </div>
         <div class="score">{score:,}</div>
     </div>
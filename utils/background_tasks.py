@@ -51,20 +51,23 @@ def update_all_user_scores():
     except Exception as e:
         print(f"Error in background task: {e}")
 
-def start_background_scheduler():
-    """Start the background scheduler"""
-    # Schedule updates every 6 hours
-    schedule.every(6).hours.do(update_all_user_scores)
+def start_background_scheduler(job=update_all_user_scores, interval_minutes=360, run_now=False):
+    """Start the background scheduler, running job every interval_minutes (6 hours by default)"""
+    scheduler = schedule.Scheduler()
+    scheduler.every(interval_minutes).minutes.do(job)
     
     def run_scheduler():
+        if run_now:
+            scheduler.run_all()
         while True:
-            schedule.run_pending()
+            scheduler.run_pending()
             time.sleep(60)  # Check every minute
     
     # Run scheduler in background thread
     scheduler_thread = threading.Thread(target=run_scheduler, daemon=True)
     scheduler_thread.start()
-    print("Background scheduler started - scores will update every 6 hours")
+    print(f"Background scheduler started - scores will update every {interval_minutes} minutes")
+    return scheduler
 
 def get_user_activity_summary(username):
     """Get summary of user activity for notifications"""
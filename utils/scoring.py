@@ -0,0 +1,60 @@
+"""
+Repository scoring kernel for the Pro leaderboard
+"""
+import numpy as np
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+def days_since(timestamps):
+    """Whole days since each GitHub timestamp ("YYYY-MM-DDTHH:MM:SSZ", UTC); NaN where missing"""
+    # GitHub always sends UTC with a trailing Z, so the first 19 characters parse straight to datetime64
+    parsed = np.array([ts[:19] if ts else "NaT" for ts in timestamps], dtype="datetime64[s]")
+    return np.floor((np.datetime64("now", "s") - parsed) / np.timedelta64(1, "D"))
+
+# Weights for the feature columns below, in order:
+# public_repos, followers, following, stars, forks, watchers, repos with a language,
+# repos updated within 30 days, repos updated within 90 days, years active
+SCORE_WEIGHTS = np.array([10, 5, 2, 3, 5, 2, 5, 20, 10, 50], dtype=np.int64)
+
+def _repo_features_loop(stars, forks, watchers, is_fork, has_lang, days_since_update):
+    """Per-user repository feature sums in a single pass; NaN days (unknown update date) count as stale"""
+    features = np.zeros(6)
+    for i in range(stars.shape[0]):
+        if is_fork[i]:  # Original repos only
+            continue
+        features[0] += stars[i]
+        features[1] += forks[i]
+        features[2] += watchers[i]
+        if has_lang[i]:
+            features[3] += 1
+        if days_since_update[i] < 30:
+            features[4] += 1
+        elif days_since_update[i] < 90:
+            features[5] += 1
+    return features
+
+def _repo_features_numpy(stars, forks, watchers, is_fork, has_lang, days_since_update):
+    """Vectorised fallback used when numba isn't installed"""
+    own = ~is_fork
+    recent = days_since_update[own] < 30
+    return np.array([
+        stars[own].sum(), forks[own].sum(), watchers[own].sum(), has_lang[own].sum(),
+        recent.sum(), ((days_since_update[own] < 90) & ~recent).sum(),
+    ], dtype=np.float64)
+
+# No fastmath: it assumes no NaNs, and NaN marks repos without an update date
+repo_features = njit(cache=True)(_repo_features_loop) if NUMBA_AVAILABLE else _repo_features_numpy
+
+def score_features(features):
+    """Scores for a feature row or an [n_users, 10] matrix: one dot product, truncated and floored at zero"""
+    return np.clip((features @ SCORE_WEIGHTS).astype(np.int64), 0, None)
+
+def warm_up_score_kernel():
+    """Trigger JIT compilation (or load it from the on-disk cache) with the argument types used at runtime"""
+    counts = np.zeros(1, dtype=np.int64)
+    flags = np.zeros(1, dtype=bool)
+    return repo_features(counts, counts, counts, flags, flags, np.zeros(1, dtype=np.float64))